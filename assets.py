@@ -0,0 +1,130 @@
+# Audio asset manager: decodes each sound file once, caches the raw PCM on disk and prefetches in the background
+
+import hashlib
+import json
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+
+def file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AudioAssets:
+    """Loads sounds from `sound_dir` as pygame Sounds, decoding each source file at most once.
+
+    Decoded PCM is written to `cache_dir` as <name>.pcm with a <name>.json
+    sidecar recording the source's mtime, size and SHA-1 plus the mixer format
+    it was decoded for. Later launches memory-map the .pcm instead of decoding.
+    A cache entry is reused while the source mtime and size are unchanged, or
+    when they changed but the content hash still matches.
+
+    All loading happens on one background thread; `prefetch` queues files
+    ahead of need and `get` collects the result.
+    """
+    def __init__(self, sound_dir, cache_dir):
+        self.sound_dir = sound_dir
+        self.cache_dir = cache_dir
+        self.mixer_format = list(pygame.mixer.get_init() or ())
+        self.loads = {}  # name -> Future resolving to a Sound (or None if it failed to load)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='audio-assets')
+        self.decoded = 0    # Files decoded from source this session
+        self.cache_hits = 0  # Files served from the PCM cache
+
+    def prefetch(self, names):
+        """Queue sounds for background loading so a later get() finds them ready"""
+        for name in names:
+            if name not in self.loads:
+                self.loads[name] = self.executor.submit(self._load, name)
+
+    def get(self, name, wait=True):
+        """Return the Sound for name, or None if it failed to load or (with wait=False) isn't ready yet"""
+        self.prefetch([name])
+        load = self.loads[name]
+        if not wait and not load.done():
+            return None
+        return load.result()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _load(self, name):
+        source = os.path.join(self.sound_dir, name)
+        try:
+            sound = self._load_cached(name, source)
+            if sound is None:
+                sound = self._decode(name, source)
+            return sound
+        except Exception:
+            print(f"Could not load sound file: {name}")
+            return None
+
+    def _paths(self, name):
+        base = os.path.join(self.cache_dir, name)
+        return base + '.pcm', base + '.json'
+
+    def _load_cached(self, name, source):
+        pcm_path, meta_path = self._paths(name)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get('mixer') != self.mixer_format:
+            return None
+
+        stat = os.stat(source)
+        if (meta.get('mtime_ns'), meta.get('size')) != (stat.st_mtime_ns, stat.st_size):
+            # Touched or replaced: only trust the cache if the content is unchanged
+            if meta.get('sha1') != file_sha1(source):
+                return None
+            meta['mtime_ns'] = stat.st_mtime_ns
+            meta['size'] = stat.st_size
+            self._write_atomic(meta_path, json.dumps(meta).encode())
+
+        try:
+            with open(pcm_path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as pcm:
+                    if len(pcm) != meta.get('bytes'):
+                        return None
+                    sound = pygame.mixer.Sound(buffer=pcm)
+        except (OSError, ValueError):
+            return None
+        self.cache_hits += 1
+        return sound
+
+    def _decode(self, name, source):
+        sound = pygame.mixer.Sound(source)
+        self.decoded += 1
+        raw = sound.get_raw()
+        stat = os.stat(source)
+        meta = {
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha1': file_sha1(source),
+            'mixer': self.mixer_format,
+            'bytes': len(raw),
+        }
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            pcm_path, meta_path = self._paths(name)
+            # PCM first: a sidecar is only ever written for a complete .pcm file
+            self._write_atomic(pcm_path, raw)
+            self._write_atomic(meta_path, json.dumps(meta).encode())
+        except OSError:
+            pass  # Caching is best effort; the decoded sound is still usable
+        return sound
+
+    @staticmethod
+    def _write_atomic(path, data):
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
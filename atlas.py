@@ -0,0 +1,51 @@
+# Shared sprite surfaces: one display-format surface per visual state instead of one per sprite
+
+import pygame
+
+
+class SurfaceAtlas:
+    """Builds each visual state's surface once and hands the same surface to every sprite that shows it.
+
+    Surfaces are converted to the display's pixel format as soon as there is a
+    display, so blits take pygame's fast same-format path; colorkeyed surfaces
+    also get RLE acceleration. Sprites must treat atlas surfaces as read-only.
+    """
+    def __init__(self):
+        self.builders = {}  # key -> function returning a fresh surface for that state
+        self.surfaces = {}  # key -> built (and, with a display, converted) surface
+        self.hits = 0
+        self.builds = 0
+
+    def get(self, key, build):
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+        self.builders[key] = build
+        self.builds += 1
+        surface = self.surfaces[key] = self._prepare(build())
+        return surface
+
+    def convert_all(self):
+        """Rebuild every surface in the display format; call after the display mode is set.
+
+        Sprites made before this keep their old surface until they are replaced.
+        """
+        for key, build in self.builders.items():
+            self.surfaces[key] = self._prepare(build())
+
+    @staticmethod
+    def _prepare(surface):
+        if pygame.display.get_surface() is None:
+            return surface  # Nothing to convert to yet (headless, or before the window opens)
+        colorkey = surface.get_colorkey()
+        if surface.get_flags() & pygame.SRCALPHA:
+            surface = surface.convert_alpha()
+        else:
+            surface = surface.convert()
+        if colorkey is not None:
+            surface.set_colorkey(colorkey, pygame.RLEACCEL)
+        return surface
+
+    def __len__(self):
+        return len(self.surfaces)
@@ -0,0 +1,193 @@
+# Difficulty balancer: sweeps physics and spider parameters over thousands of seeded bot playthroughs on every core
+
+import os
+
+# The dummy drivers have to be selected before pygame initializes in main
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import csv
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from main import FINAL_LEVEL, GRAVITY, JUMP_SPEED, SPIDER_SPEED_PER_LEVEL, SPIDERS_PER_LEVEL
+from vecenv import BatchGame, chase_actions
+
+# Per-run result arrays, shape (combinations, runs) unless noted
+RESULT_FIELDS = [
+    ('score', np.int64),
+    ('level', np.int16),     # Level reached
+    ('frames', np.int32),    # Frames until the run ended (or max_frames if it never did)
+    ('won', np.bool_),
+    ('deaths', np.uint16),   # Lives lost on each level, shape (combinations, runs, FINAL_LEVEL)
+]
+
+
+class SharedResults:
+    """Result arrays in shared memory, so worker processes write their runs in place"""
+    def __init__(self, combinations, runs, names=None):
+        self.shape = (combinations, runs)
+        self.blocks = {}
+        self.arrays = {}
+        for field, dtype in RESULT_FIELDS:
+            shape = self.shape + (FINAL_LEVEL,) if field == 'deaths' else self.shape
+            size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            if names is None:
+                block = shared_memory.SharedMemory(create=True, size=size)
+            else:
+                block = shared_memory.SharedMemory(name=names[field])
+            self.blocks[field] = block
+            self.arrays[field] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            if names is None:
+                self.arrays[field][...] = 0
+
+    def names(self):
+        return {field: block.name for field, block in self.blocks.items()}
+
+    def __getitem__(self, field):
+        return self.arrays[field]
+
+    def close(self):
+        self.arrays.clear()
+        for block in self.blocks.values():
+            block.close()
+
+    def unlink(self):
+        for block in self.blocks.values():
+            block.unlink()
+
+
+# Each worker process attaches to the shared results once, in _attach
+_results = None
+
+
+def _attach(shape, names):
+    global _results
+    _results = SharedResults(*shape, names=names)
+
+
+def play_chunk(combination, params, first_run, runs, seed, max_frames):
+    """Play runs [first_run, first_run + runs) of one parameter combination with the chase bot.
+
+    Run r of every combination is seeded with seed + r, so combinations are
+    compared on the same spider layouts wherever their rules allow it.
+    """
+    gravity, jump_speed, speed_per_level, spiders_per_level = params
+    batch = BatchGame(runs, seeds=range(seed + first_run, seed + first_run + runs),
+                      spiders_per_level=spiders_per_level, auto_reset=False,
+                      gravity=gravity, jump_speed=jump_speed, speed_per_level=speed_per_level)
+    deaths = np.zeros((runs, FINAL_LEVEL), dtype=np.uint16)
+    frames = np.full(runs, max_frames, dtype=np.int32)
+    for frame in range(1, max_frames + 1):
+        _, dones = batch.step(chase_actions(batch))
+        if batch.lost_life.any():
+            hurt = np.flatnonzero(batch.lost_life)
+            deaths[hurt, batch.level[hurt] - 1] += 1
+        frames[dones] = frame
+        if batch.game_over.all():
+            break
+
+    rows = slice(first_run, first_run + runs)
+    _results['score'][combination, rows] = batch.score
+    _results['level'][combination, rows] = batch.level
+    _results['frames'][combination, rows] = frames
+    _results['won'][combination, rows] = batch.game_won
+    _results['deaths'][combination, rows] = deaths
+    return combination, runs
+
+
+def run_sweep(combinations, runs, seed=0, max_frames=20000, workers=None, chunk_size=256):
+    """Play every combination `runs` times across a process pool and return the results as plain arrays"""
+    results = SharedResults(len(combinations), runs)
+    try:
+        chunks = [(c, params, start, min(chunk_size, runs - start), seed, max_frames)
+                  for c, params in enumerate(combinations) for start in range(0, runs, chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                 initargs=((len(combinations), runs), results.names())) as pool:
+            # Futures are only waited on so worker errors surface here
+            for future in [pool.submit(play_chunk, *chunk) for chunk in chunks]:
+                future.result()
+        return {field: results[field].copy() for field, _ in RESULT_FIELDS}
+    finally:
+        results.close()
+        results.unlink()
+
+
+def summarize(combinations, results):
+    """One summary row per parameter combination"""
+    rows = []
+    for c, (gravity, jump_speed, speed_per_level, spiders_per_level) in enumerate(combinations):
+        scores = results['score'][c]
+        deaths = results['deaths'][c].astype(np.int64)
+        p10, p50, p90 = np.percentile(scores, [10, 50, 90])
+        rows.append({
+            'gravity': gravity,
+            'jump_speed': jump_speed,
+            'speed_per_level': speed_per_level,
+            'spiders': spiders_per_level,
+            'completion': round(float(results['won'][c].mean()), 4),
+            'mean_level': round(float(results['level'][c].mean()), 2),
+            'deaths_per_run': round(float(deaths.sum(axis=1).mean()), 3),
+            'score_p10': int(p10),
+            'score_p50': int(p50),
+            'score_p90': int(p90),
+            'mean_frames': int(results['frames'][c].mean()),
+            # Lives lost per run on each level, for spotting difficulty spikes
+            'deaths_by_level': ' '.join(f'{d:.2f}' for d in deaths.mean(axis=0)),
+        })
+    return rows
+
+
+def print_table(rows):
+    columns = list(rows[0])
+    widths = {column: max(len(column), *(len(str(row[column])) for row in rows)) for column in columns}
+    print('  '.join(column.rjust(widths[column]) for column in columns))
+    for row in rows:
+        print('  '.join(str(row[column]).rjust(widths[column]) for column in columns))
+
+
+def parse_values(text, kind=float):
+    return [kind(value) for value in text.split(',')]
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Sweep difficulty parameters over seeded bot playthroughs")
+    parser.add_argument('--gravity', type=parse_values, default=[GRAVITY], help='comma-separated gravity values')
+    parser.add_argument('--jump-speed', type=parse_values, default=[JUMP_SPEED], help='comma-separated jump speeds (negative is up)')
+    parser.add_argument('--speed-per-level', type=parse_values, default=[SPIDER_SPEED_PER_LEVEL],
+                        help='comma-separated spider speed increases per level')
+    parser.add_argument('--spiders', type=lambda text: parse_values(text, int), default=[SPIDERS_PER_LEVEL],
+                        help='comma-separated spiders per level')
+    parser.add_argument('--runs', type=int, default=1000, help='playthroughs per parameter combination')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first run; run r uses seed + r')
+    parser.add_argument('--max-frames', type=int, default=20000, help='frames before an unfinished run is cut off')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per core)')
+    parser.add_argument('--chunk-size', type=int, default=256, help='runs played together by one worker task')
+    parser.add_argument('--out', metavar='PATH', help='also write the summary table to PATH as CSV')
+    args = parser.parse_args()
+
+    combinations = list(itertools.product(args.gravity, args.jump_speed, args.speed_per_level, args.spiders))
+    start = time.perf_counter()
+    results = run_sweep(combinations, args.runs, seed=args.seed, max_frames=args.max_frames,
+                        workers=args.workers, chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - start
+
+    rows = summarize(combinations, results)
+    print_table(rows)
+    games = len(combinations) * args.runs
+    print(f"{games:,} playthroughs, {int(results['frames'].sum()):,} frames in {elapsed:.1f}s")
+    if args.out:
+        with open(args.out, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,94 @@
+# Benchmark: broadphase collision lookup vs pygame.sprite.spritecollide
+#
+#   python benchmarks/bench_collisions.py [--counts 10 1000 100000]
+
+import os
+import sys
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import time
+
+import pygame
+
+import main
+from collision import SpatialGrid
+
+
+def best_time(func, repeat):
+    """Best per-call time in microseconds over `repeat` calls"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6
+
+
+def bench_count(count, repeat):
+    random.seed(count)
+    y = main.SCREEN_HEIGHT - 80
+    xs = [random.randint(0, main.SCREEN_WIDTH - main.SPIDER_WIDTH) for _ in range(count)]
+    # Zach standing on the ground in the middle of the screen
+    zach = pygame.sprite.Sprite()
+    zach.rect = pygame.Rect(main.SCREEN_WIDTH // 2, main.SCREEN_HEIGHT - 100, 30, 40)
+
+    group = pygame.sprite.Group()
+    grid = SpatialGrid(main.COLLISION_CELL_SIZE, main.SPIDER_WIDTH, main.SPIDER_HEIGHT)
+    swarm = main.SpiderSwarm()
+    swarm.reset(count)
+    for x in xs:
+        spider = main.Spider(x, y)
+        group.add(spider)
+        grid.insert(spider, x, y)
+        swarm.spawn(x, y)
+    swarm.refresh_grid()
+
+    def grid_query():
+        return [spider for spider in grid.query(zach.rect) if zach.rect.colliderect(spider.rect)]
+
+    def grid_sync():
+        for spider in group:
+            spider.update()
+            grid.move(spider, spider.rect.x, spider.rect.y)
+
+    def sprite_update():
+        for spider in group:
+            spider.update()
+
+    expected = set(pygame.sprite.spritecollide(zach, group, False))
+    assert set(grid_query()) == expected
+    assert len(swarm.collide(zach.rect)) == len(expected)
+
+    return {
+        'spritecollide': best_time(lambda: pygame.sprite.spritecollide(zach, group, False), repeat),
+        'grid query': best_time(grid_query, repeat),
+        'swarm query': best_time(lambda: swarm.collide(zach.rect), repeat),
+        'sprite update': best_time(sprite_update, max(1, repeat // 10)),
+        'sprite update + grid': best_time(grid_sync, max(1, repeat // 10)),
+        'swarm update + index': best_time(swarm.update, repeat),
+        'hits': len(expected),
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description='Compare broadphase collision lookup with spritecollide')
+    parser.add_argument('--counts', type=int, nargs='+', default=[10, 1000, 100000], help='spider counts to test')
+    parser.add_argument('--repeat', type=int, default=200, help='timed calls per measurement')
+    args = parser.parse_args()
+
+    columns = ['spritecollide', 'grid query', 'swarm query', 'sprite update', 'sprite update + grid', 'swarm update + index']
+    print('best time per call in microseconds')
+    print(f"{'spiders':>8} " + ' '.join(f'{name:>21}' for name in columns) + f" {'hits':>6}")
+    for count in args.counts:
+        result = bench_count(count, args.repeat)
+        print(f'{count:>8} ' + ' '.join(f'{result[name]:>21.1f}' for name in columns) + f" {result['hits']:>6}")
+
+
+if __name__ == "__main__":
+    main_cli()
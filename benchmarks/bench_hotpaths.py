@@ -0,0 +1,244 @@
+# Benchmark suite: times every hot path in main.py on the SDL dummy drivers and gates on regressions
+#
+#   python benchmarks/bench_hotpaths.py --out bench.json
+#   python benchmarks/bench_hotpaths.py --baseline bench.json [--threshold 0.15]
+#
+# With --baseline the exit status is 1 when any benchmark's median got slower
+# than the baseline's by more than the threshold. Each benchmark keeps its
+# fastest of --rounds runs, which filters out most scheduler noise.
+
+import os
+import sys
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import argparse
+import gc
+import json
+import platform
+import statistics
+import tempfile
+import time
+
+import numpy as np
+import pygame
+
+import main
+from main import Game
+
+# Everything the games write (high scores, the scoreboard, the PCM cache) goes to a scratch
+# directory instead of the working tree; --out and --baseline stay relative to where we were run
+WORK_DIR = tempfile.TemporaryDirectory(prefix='zach-bench-')
+main.SOUND_DIR = os.path.join(ROOT, 'sound')
+main.SOUND_CACHE_DIR = os.path.join(WORK_DIR.name, 'pcm-cache')
+main.HIGH_SCORE_FILE = os.path.join(WORK_DIR.name, main.HIGH_SCORE_FILE)
+main.SCOREBOARD_FILE = os.path.join(WORK_DIR.name, main.SCOREBOARD_FILE)
+
+
+def measure(func, repeat, setup=None):
+    """Per-call times in microseconds; setup (untimed) runs before every call"""
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter_ns()
+        func()
+        samples.append((time.perf_counter_ns() - start) / 1000)
+    return samples
+
+
+def place_spiders(game, positions):
+    """Move the first spiders of a sprite game to (x, y) positions and park the rest out of the way"""
+    for i, spider in enumerate(game.spider_sprites):
+        x, y = positions[i] if i < len(positions) else (main.SCREEN_WIDTH - main.SPIDER_WIDTH - 5 * (i % 20), main.SPIDER_SPAWN_Y)
+        spider.rect.topleft = (x, y)
+        game.spider_grid.move(spider, x, y)
+
+
+def collision_scenario(kind):
+    """A headless game one handle_collisions call away from a stomp, side hit or 4-spider multikill"""
+    game = Game(headless=True, seed=1)
+    zach = game.zach
+    zach.invincible_timer = 0
+    x = 300
+    if kind == 'side':
+        place_spiders(game, [(x + 20, main.SPIDER_SPAWN_Y)])
+        zach.rect.topleft = (x, main.SCREEN_HEIGHT - 60 - zach.rect.height)
+        zach.vel_y = 0
+    else:
+        count = 4 if kind == 'multikill' else 1
+        place_spiders(game, [(x, main.SPIDER_SPAWN_Y)] * count)
+        zach.rect.bottom = main.SPIDER_SPAWN_Y + 5
+        zach.rect.x = x
+        zach.vel_y = 6
+    saved = game.snapshot()
+    return game, lambda: game.restore(saved)
+
+
+def bench_sounds(repeat):
+    return {
+        'generate_kill_sound': measure(lambda: main.generate_kill_sound(1.2), repeat),
+        'generate_multi_kill_sound': measure(lambda: main.generate_multi_kill_sound(4), repeat),
+    }
+
+
+def bench_setup_level(repeat):
+    results = {}
+    for count in (main.SPIDERS_PER_LEVEL, 1000):
+        game = Game(headless=True, seed=1, spiders_per_level=count)
+        results[f'setup_level[{count}]'] = measure(game.setup_level, repeat if count < 1000 else max(1, repeat // 10))
+    return results
+
+
+def bench_spider_update(repeat):
+    results = {}
+    for count in (main.SPIDERS_PER_LEVEL, 1000):
+        game = Game(headless=True, seed=1, spiders_per_level=count)
+
+        def update():
+            for spider in game.spiders:
+                spider.update()
+
+        results[f'spider_update[{count}]'] = measure(update, repeat)
+    return results
+
+
+def bench_collisions(repeat):
+    results = {}
+    for kind in ('stomp', 'side', 'multikill'):
+        game, reset = collision_scenario(kind)
+        results[f'handle_collisions[{kind}]'] = measure(game.handle_collisions, repeat, setup=reset)
+    return results
+
+
+def bench_scoring(repeat):
+    game = Game(headless=True, seed=1)
+    popups = game.popups
+    for i in range(main.POPUP_CAPACITY):
+        popups.spawn_text(f'+{i * 10}', 20 + i * 10, 300, ttl=1 << 30)
+    return {f'update_scoring[{main.POPUP_CAPACITY} popups]': measure(game.update_scoring, repeat)}
+
+
+def windowed_game():
+    """A game with a (dummy) window for the draw benchmarks, with score saving turned off"""
+    game = Game(seed=1)
+    game.scores.close()
+    game.scores = None
+    return game
+
+
+def bench_draw(game, repeat, counts):
+    results = {}
+    for count in counts:
+        game.spiders_per_level = count
+        game.setup_level()
+        game.zach.invincible_timer = 0  # No blinking, so every frame draws the same things
+        game.draw()
+        results[f'draw[{count}]'] = measure(game.draw, repeat)
+    return results
+
+
+def summarize(samples):
+    return {
+        'median_us': round(statistics.median(samples), 2),
+        'best_us': round(min(samples), 2),
+        'p90_us': round(float(np.percentile(samples, 90)), 2),
+        'calls': len(samples),
+    }
+
+
+def run_suite(repeat, draw_counts, only=None, rounds=1):
+    """Run the benchmark groups `rounds` times, keeping each benchmark's fastest round by median"""
+    def selected(name):
+        return not only or any(pattern in name for pattern in only)
+
+    draw_game = windowed_game() if selected('draw') else None
+    groups = [
+        ('sounds', lambda: bench_sounds(repeat)),
+        ('setup_level', lambda: bench_setup_level(repeat)),
+        ('spider_update', lambda: bench_spider_update(repeat)),
+        ('collisions', lambda: bench_collisions(repeat)),
+        ('scoring', lambda: bench_scoring(repeat)),
+        ('draw', lambda: bench_draw(draw_game, repeat, draw_counts)),
+    ]
+    results = {}
+    try:
+        for _ in range(rounds):
+            for name, run in groups:
+                if not selected(name):
+                    continue
+                gc.collect()
+                for bench, samples in run().items():
+                    result = summarize(samples)
+                    if bench not in results or result['median_us'] < results[bench]['median_us']:
+                        results[bench] = result
+    finally:
+        if draw_game:
+            draw_game.shutdown()  # Stops the audio, music and voice threads
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print current medians against the baseline's and return the names that regressed"""
+    regressions = []
+    print(f"{'benchmark':<34}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:<34}{'-':>12}{result['median_us']:>12.1f}{'new':>9}")
+            continue
+        change = result['median_us'] / old['median_us'] - 1
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<34}{old['median_us']:>12.1f}{result['median_us']:>12.1f}{change:>+9.1%}{flag}")
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Time main.py's hot paths and compare them with a baseline")
+    parser.add_argument('--repeat', type=int, default=200, help='timed calls per benchmark')
+    parser.add_argument('--rounds', type=int, default=3, help='suite runs; each benchmark keeps its fastest')
+    parser.add_argument('--draw-counts', type=int, nargs='+', default=[10, 100, 1000], help='spider counts for draw')
+    parser.add_argument('--only', nargs='+', help='run only the benchmark groups whose name contains one of these')
+    parser.add_argument('--out', metavar='PATH', help='write the results as JSON to PATH')
+    parser.add_argument('--baseline', metavar='PATH', help='compare with results saved by --out')
+    parser.add_argument('--threshold', type=float, default=0.15, help='slowdown fraction that counts as a regression')
+    args = parser.parse_args()
+
+    results = run_suite(args.repeat, args.draw_counts, args.only, args.rounds)
+    report = {
+        'created_at': time.time(),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'repeat': args.repeat,
+        'rounds': args.rounds,
+        'results': results,
+    }
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=1)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        return
+
+    print(f"{'benchmark':<34}{'median us':>12}{'best us':>12}")
+    for name, result in results.items():
+        print(f"{name:<34}{result['median_us']:>12.1f}{result['best_us']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,120 @@
+# Frame capture: copies drawn frames into a pool of preallocated buffers and writes them from a background thread
+
+import os
+import queue
+import subprocess
+import sys
+import threading
+
+import numpy as np
+import pygame
+
+FORMATS = ('raw', 'png', 'pipe')
+
+
+class FrameRecorder:
+    """Records the display surface to `target` without ever making the game loop wait.
+
+    capture() reads the 32-bit `surface` through a pygame.surfarray view and
+    copies its pixels as they are, one straight memory copy, into one of
+    `slots` preallocated buffers; the writer thread converts that buffer to RGB,
+    encodes it and hands it back. When every buffer is still waiting to be
+    written the frame is dropped and counted instead.
+
+    Formats: 'raw' appends rgb24 frames to the file `target` (ffmpeg reads it
+    with -f rawvideo -pix_fmt rgb24 -s WxH), 'png' writes numbered PNGs into
+    the directory `target`, and 'pipe' streams rgb24 frames into the stdin of
+    the shell command `target`, where {width}, {height} and {fps} are filled in.
+    """
+    def __init__(self, target, surface, fmt='raw', slots=8, fps=60):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown capture format {fmt!r}, expected one of {', '.join(FORMATS)}")
+        if surface.get_bytesize() != 4:
+            raise ValueError("Frame capture needs a 32-bit display surface")
+        self.target = target
+        self.surface = surface
+        self.format = fmt
+        self.width, self.height = surface.get_size()
+        self.fps = fps
+        # Frames are kept in the surface's own pixel format, row-major like the surface itself
+        self.buffers = np.zeros((slots, self.height, self.width), dtype=np.uint32)
+        # Byte offsets of red, green and blue within a pixel, for the writer's RGB conversion
+        self.channels = [shift // 8 if sys.byteorder == 'little' else 3 - shift // 8
+                         for shift in surface.get_shifts()[:3]]
+        self.rgb = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        self.free = queue.SimpleQueue()
+        for slot in range(slots):
+            self.free.put(slot)
+        self.pending = queue.SimpleQueue()  # Slots holding a frame, or None to stop
+        self.captured = 0  # Frames handed to the writer
+        self.dropped = 0   # Frames skipped because the writer fell behind
+        self.written = 0   # Frames the writer finished
+        self.error = None  # First write failure; capturing stops after it
+        self.sink = self._open()
+        self.writer = threading.Thread(target=self._writer_loop, name='frame-writer', daemon=True)
+        self.writer.start()
+
+    def _open(self):
+        if self.format == 'raw':
+            return open(self.target, 'wb')
+        if self.format == 'png':
+            os.makedirs(self.target, exist_ok=True)
+            return None
+        command = self.target.format(width=self.width, height=self.height, fps=self.fps)
+        return subprocess.Popen(command, shell=True, stdin=subprocess.PIPE)
+
+    def capture(self):
+        """Queue a copy of the surface's current pixels, or drop the frame if no buffer is free"""
+        if self.error is not None:
+            return
+        try:
+            slot = self.free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return
+        view = pygame.surfarray.pixels2d(self.surface)  # (width, height) view that locks the surface
+        np.copyto(self.buffers[slot], view.T)
+        del view
+        self.captured += 1
+        self.pending.put(slot)
+
+    def close(self):
+        """Write every queued frame, then close the output"""
+        self.pending.put(None)
+        self.writer.join()
+        if self.format == 'raw':
+            self.sink.close()
+        elif self.format == 'pipe':
+            try:
+                self.sink.stdin.close()
+            except OSError:
+                pass
+            self.sink.wait()
+
+    def summary(self):
+        return f"{self.written} frames written to {self.target}, {self.dropped} dropped"
+
+    def _writer_loop(self):
+        while True:
+            slot = self.pending.get()
+            if slot is None:
+                return
+            if self.error is None:
+                try:
+                    self._write(self.buffers[slot])
+                    self.written += 1
+                except (OSError, pygame.error) as error:
+                    print(f"Frame capture stopped: {error}")
+                    self.error = error
+            self.free.put(slot)
+
+    def _write(self, pixels):
+        frame = self.rgb
+        np.take(pixels.view(np.uint8).reshape(self.height, self.width, 4), self.channels, axis=2, out=frame)
+        if self.format == 'png':
+            image = pygame.image.frombuffer(frame, (self.width, self.height), 'RGB')
+            pygame.image.save(image, os.path.join(self.target, f'frame{self.written:06d}.png'))
+        elif self.format == 'raw':
+            self.sink.write(frame)
+        else:
+            self.sink.stdin.write(frame)
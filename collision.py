@@ -0,0 +1,197 @@
+# Broadphase spatial index for Zach-vs-spider collision
+
+import numpy as np
+
+
+class SpatialGrid:
+    """Uniform grid bucketing objects by the cell of their top-left corner.
+
+    Each object lives in exactly one cell, so moving it only touches the grid
+    when it crosses a cell boundary. Queries widen the searched area by the
+    largest object size so objects hanging over a cell edge are still found.
+    """
+    def __init__(self, cell_size, max_width, max_height):
+        self.cell_size = cell_size
+        self.max_width = max_width
+        self.max_height = max_height
+        self.cells = {}      # (cell_x, cell_y) -> set of keys
+        self.key_cells = {}  # key -> (cell_x, cell_y)
+
+    def cell_of(self, x, y):
+        return (int(x) // self.cell_size, int(y) // self.cell_size)
+
+    def insert(self, key, x, y):
+        cell = self.cell_of(x, y)
+        self.key_cells[key] = cell
+        self.cells.setdefault(cell, set()).add(key)
+
+    def move(self, key, x, y):
+        """Update an object's integer position, only rebucketing it if it changed cell"""
+        size = self.cell_size
+        cell = (x // size, y // size)
+        old_cell = self.key_cells[key]
+        if cell == old_cell:
+            return
+        self._discard(key, old_cell)
+        self.key_cells[key] = cell
+        self.cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key):
+        old_cell = self.key_cells.pop(key, None)
+        if old_cell is not None:
+            self._discard(key, old_cell)
+
+    def _discard(self, key, cell):
+        bucket = self.cells[cell]
+        bucket.discard(key)
+        if not bucket:
+            del self.cells[cell]
+
+    def clear(self):
+        self.cells.clear()
+        self.key_cells.clear()
+
+    def query(self, rect):
+        """Return the keys of every object whose bounds could overlap rect"""
+        size = self.cell_size
+        first_x = (rect.left - self.max_width) // size
+        last_x = rect.right // size
+        first_y = (rect.top - self.max_height) // size
+        last_y = rect.bottom // size
+
+        candidates = []
+        for cell_x in range(first_x, last_x + 1):
+            for cell_y in range(first_y, last_y + 1):
+                bucket = self.cells.get((cell_x, cell_y))
+                if bucket:
+                    candidates.extend(bucket)
+        return candidates
+
+    def __len__(self):
+        return len(self.key_cells)
+
+
+class SortedCellIndex:
+    """Array-backed broadphase for objects stored as indices into NumPy arrays.
+
+    Live indices are kept sorted by the grid cell of their top-left corner, so
+    the objects in a run of cells form one contiguous slice found by binary
+    search. After a vectorized move only the objects that crossed a cell
+    boundary are pulled out and merged back in.
+    """
+    def __init__(self, cell_size, max_width, max_height, world_width, world_height):
+        self.cell_size = cell_size
+        self.max_width = max_width
+        self.max_height = max_height
+        self.columns = world_width // cell_size + 1
+        self.rows = world_height // cell_size + 1
+        self.reset(0)
+
+    def reset(self, capacity):
+        self.keys = np.zeros(capacity, dtype=np.int64)  # cell key per object
+        self.order = np.zeros(0, dtype=np.int64)         # live indices sorted by cell key
+        self.sorted_keys = np.zeros(0, dtype=np.int64)   # keys[order]
+
+    def cell_keys(self, x, y):
+        # Positions outside the world are clamped into the edge cells
+        cell_x = np.clip(np.asarray(x, dtype=np.int64) // self.cell_size, 0, self.columns - 1)
+        cell_y = np.clip(np.asarray(y, dtype=np.int64) // self.cell_size, 0, self.rows - 1)
+        return cell_y * self.columns + cell_x
+
+    def rebuild(self, x, y, alive):
+        """Index every live object from scratch"""
+        n = len(x)
+        self.keys[:n] = self.cell_keys(x, y)
+        live = np.flatnonzero(alive)
+        self.order = live[np.argsort(self.keys[live], kind='stable')]
+        self.sorted_keys = self.keys[self.order]
+
+    def sync(self, x, y, alive):
+        """Re-slot the live objects whose cell changed since the last sync or rebuild"""
+        n = len(x)
+        new_keys = self.cell_keys(x, y)
+        changed = new_keys != self.keys[:n]
+        changed &= alive
+        if not changed.any():
+            return
+        keep = ~changed[self.order]
+        moved = np.flatnonzero(changed)
+        moved_keys = new_keys[moved]
+        by_key = np.argsort(moved_keys, kind='stable')
+        moved = moved[by_key]
+        moved_keys = moved_keys[by_key]
+
+        order = self.order[keep]
+        sorted_keys = self.sorted_keys[keep]
+        slots = np.searchsorted(sorted_keys, moved_keys, side='right')
+        self.order = np.insert(order, slots, moved)
+        self.sorted_keys = np.insert(sorted_keys, slots, moved_keys)
+        self.keys[moved] = moved_keys
+
+    def remove(self, index):
+        key = self.keys[index]
+        lo = np.searchsorted(self.sorted_keys, key, side='left')
+        hi = np.searchsorted(self.sorted_keys, key, side='right')
+        slot = lo + np.flatnonzero(self.order[lo:hi] == index)
+        self.order = np.delete(self.order, slot)
+        self.sorted_keys = np.delete(self.sorted_keys, slot)
+
+    def query(self, rect):
+        """Return the sorted indices of every object whose bounds could overlap rect"""
+        size = self.cell_size
+        first_x = max((rect.left - self.max_width) // size, 0)
+        last_x = min(rect.right // size, self.columns - 1)
+        first_y = max((rect.top - self.max_height) // size, 0)
+        last_y = min(rect.bottom // size, self.rows - 1)
+        if first_x > last_x or first_y > last_y:
+            return np.zeros(0, dtype=np.int64)
+
+        # One contiguous slice of the sorted order per row of cells
+        row_starts = np.arange(first_y, last_y + 1) * self.columns
+        lo = np.searchsorted(self.sorted_keys, row_starts + first_x, side='left')
+        hi = np.searchsorted(self.sorted_keys, row_starts + last_x, side='right')
+        if len(lo) == 1:
+            candidates = self.order[lo[0]:hi[0]].copy()
+        else:
+            candidates = np.concatenate([self.order[a:b] for a, b in zip(lo.tolist(), hi.tolist())])
+        candidates.sort()
+        return candidates
+
+    def __len__(self):
+        return len(self.order)
+
+
+def sweep_times(rect, dx, dy, xs, ys, dxs, width, height):
+    """Time of first contact, as a fraction of the step, between a moving rect and many moving boxes.
+
+    rect is where the mover starts the step and (dx, dy) how far it moves over
+    it; the boxes are width x height, start at (xs, ys) and move dxs sideways.
+    Motion is taken as linear within the step. Boxes count as touching when
+    they overlap like Rect.colliderect (shared edges don't), so a box already
+    overlapping at the start gets 0, and boxes never touched get inf.
+    """
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    # Work in the boxes' frame: only the relative motion matters
+    rel_dx = dx - np.asarray(dxs, dtype=np.float64)
+    entry_x, leave_x = _axis_interval(rect.left, rect.width, rel_dx, xs, width)
+    entry_y, leave_y = _axis_interval(rect.top, rect.height, np.full_like(xs, dy), ys, height)
+    entry = np.maximum(entry_x, entry_y)
+    leave = np.minimum(leave_x, leave_y)
+    hit = (entry < leave) & (entry < 1) & (leave > 0)
+    return np.where(hit, np.maximum(entry, 0.0), np.inf)
+
+
+def _axis_interval(start, size, delta, others, other_size):
+    """Open time interval over which [start, start + size) moving by delta overlaps each [other, other + other_size)"""
+    still = delta == 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_a = (others - (start + size)) / delta
+        t_b = (others + other_size - start) / delta
+    entry = np.minimum(t_a, t_b)
+    leave = np.maximum(t_a, t_b)
+    # Not moving on this axis: overlapping for the whole step or never
+    overlapping = (start < others + other_size) & (start + size > others)
+    entry = np.where(still, np.where(overlapping, -np.inf, np.inf), entry)
+    leave = np.where(still, np.where(overlapping, np.inf, -np.inf), leave)
+    return entry, leave
@@ -0,0 +1,82 @@
+# Per-frame player input, decoupled from the keyboard so the game can be driven by bots and replays
+
+import pygame
+
+# Bit layout used when an input is packed into a replay log
+LEFT_BIT = 1
+RIGHT_BIT = 2
+JUMP_BIT = 4
+RESTART_BIT = 8
+
+# Keys bound to each action
+LEFT_KEYS = (pygame.K_LEFT, pygame.K_a)
+RIGHT_KEYS = (pygame.K_RIGHT, pygame.K_d)
+JUMP_KEYS = (pygame.K_SPACE, pygame.K_UP, pygame.K_w)
+
+
+class FrameInput:
+    """One frame of player input, so the simulation never has to read the keyboard itself"""
+    __slots__ = ('left', 'right', 'jump', 'restart')
+    
+    def __init__(self, left=False, right=False, jump=False, restart=False):
+        self.left = left
+        self.right = right
+        self.jump = jump
+        self.restart = restart
+    
+    @classmethod
+    def from_keyboard(cls):
+        """Sample the current keyboard state into a FrameInput"""
+        keys = pygame.key.get_pressed()
+        return cls(
+            left=any(keys[key] for key in LEFT_KEYS),
+            right=any(keys[key] for key in RIGHT_KEYS),
+            jump=any(keys[key] for key in JUMP_KEYS),
+            restart=bool(keys[pygame.K_r]),
+        )
+    
+    @classmethod
+    def from_bits(cls, bits):
+        return cls(
+            left=bool(bits & LEFT_BIT),
+            right=bool(bits & RIGHT_BIT),
+            jump=bool(bits & JUMP_BIT),
+            restart=bool(bits & RESTART_BIT),
+        )
+    
+    def to_bits(self):
+        """Pack this input into the low 4 bits of an int"""
+        return ((LEFT_BIT if self.left else 0) | (RIGHT_BIT if self.right else 0)
+                | (JUMP_BIT if self.jump else 0) | (RESTART_BIT if self.restart else 0))
+
+
+
+class KeyboardInput:
+    """One FrameInput kept up to date from key events, for game loops that read the keyboard every frame.
+
+    FrameInput.from_keyboard() copies SDL's whole key state into a new
+    8 KB tuple on every call. This reads it once, then only touches its
+    `controls` when a bound key goes down or up, so a frame without key
+    events gets its input without allocating anything. `restart` is left
+    to the game loop, which sets it from the presses it polled.
+    """
+    def __init__(self):
+        keys = pygame.key.get_pressed()
+        self.down = {key: bool(keys[key]) for key in LEFT_KEYS + RIGHT_KEYS + JUMP_KEYS}
+        self.controls = FrameInput()
+        self._refresh()
+
+    def handle(self, event):
+        """Apply a KEYDOWN or KEYUP event"""
+        if event.key in self.down:
+            self.down[event.key] = event.type == pygame.KEYDOWN
+            self._refresh()
+
+    def _refresh(self):
+        down = self.down
+        self.controls.left = any(down[key] for key in LEFT_KEYS)
+        self.controls.right = any(down[key] for key in RIGHT_KEYS)
+        self.controls.jump = any(down[key] for key in JUMP_KEYS)
+
+
+NO_INPUT = FrameInput()
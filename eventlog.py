@@ -0,0 +1,286 @@
+# Gameplay event log: fixed-size binary records appended from a background thread, and a NumPy analyzer for them
+#
+#   python main.py --event-log runs.zev
+#   python eventlog.py runs.zev logs/ [--json summary.json]
+#
+# A log file is a 16-byte header followed by RECORD_DTYPE records. Runs are
+# appended one after the other, each ending in a GAME_END or QUIT record, so
+# any number of sessions can share a file; a record cut short by a crash is
+# ignored by the analyzer.
+
+import argparse
+import json
+import os
+import queue
+import struct
+import threading
+
+import numpy as np
+
+HEADER = struct.Struct('<8sII')  # magic, version, record size
+MAGIC = b'ZSEVENTS'
+VERSION = 1
+
+# Record kinds
+KILL = 1         # count: spiders killed by the stomp, value: consecutive kills after it, x/y: where
+LIFE_LOST = 2    # count: blocks left (0 when it ended the run), x/y: Zach's centre
+LEVEL_CLEAR = 3  # value: frames from the level's start to its last kill
+GAME_END = 4     # count: 1 if the game was won, value: best combo
+QUIT = 5         # Run left unfinished when the game closed; value: best combo
+KIND_NAMES = {KILL: 'kill', LIFE_LOST: 'life_lost', LEVEL_CLEAR: 'level_clear', GAME_END: 'game_end', QUIT: 'quit'}
+
+RECORD_DTYPE = np.dtype([
+    ('kind', 'u1'),
+    ('level', 'u1'),
+    ('count', '<u2'),
+    ('frame', '<u4'),   # Frames since the run started
+    ('value', '<u4'),
+    ('x', '<i2'),
+    ('y', '<i2'),
+    ('score', '<i8'),   # Score right after the event
+])
+
+FRAMES_PER_SECOND = 60
+HOTSPOT_BIN_WIDTH = 50  # Death hotspots are counted in columns this many pixels wide
+HOTSPOT_BINS = 16       # Columns across the 800px screen; anything further right lands in the last
+
+
+class EventLog:
+    """Appends gameplay events to a log file without doing file I/O on the game thread.
+
+    Events are written into a preallocated batch of `batch_records` records.
+    A full batch, or any partial one on flush(), is handed to the writer
+    thread, which appends it to the file, and the game carries on in a spare
+    batch. The game flushes at the end of every run, so at most the current
+    run's events are lost if the process dies.
+    """
+    def __init__(self, path, batch_records=4096, spare_batches=2):
+        self.path = path
+        self.batch = np.zeros(batch_records, dtype=RECORD_DTYPE)
+        self.count = 0  # Records in the current batch
+        self.free = queue.SimpleQueue()
+        for _ in range(spare_batches):
+            self.free.put(np.zeros(batch_records, dtype=RECORD_DTYPE))
+        self.pending = queue.SimpleQueue()  # (batch, records) to write, or None to stop
+        self.records = 0          # Records logged
+        self.written = 0          # Records the writer appended
+        self.extra_batches = 0    # Batches allocated because the writer had every spare one
+        self.error = None
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize))
+        self.writer = threading.Thread(target=self._writer_loop, name='event-writer', daemon=True)
+        self.writer.start()
+
+    def record(self, kind, game, count=0, value=0, x=0, y=0):
+        """Append one event, stamped with game's level, run frame and score"""
+        self.batch[self.count] = (kind, game.level, count, game.frame, value, x, y, game.score)
+        self.count += 1
+        self.records += 1
+        if self.count == len(self.batch):
+            self.flush()
+
+    def kill(self, game, spiders, x, y):
+        self.record(KILL, game, spiders, game.zach.consecutive_kills, x, y)
+
+    def life_lost(self, game):
+        zach = game.zach
+        self.record(LIFE_LOST, game, zach.blocks if game.zach_alive else 0, 0, *zach.rect.center)
+
+    def level_clear(self, game):
+        self.record(LEVEL_CLEAR, game, value=game.frame - game.level_start_frame)
+
+    def game_end(self, game):
+        self.record(GAME_END, game, int(game.game_won), game.best_combo)
+        self.flush()
+
+    def quit(self, game):
+        self.record(QUIT, game, value=game.best_combo)
+
+    def flush(self):
+        """Hand the current batch to the writer thread"""
+        if not self.count:
+            return
+        self.pending.put((self.batch, self.count))
+        try:
+            self.batch = self.free.get_nowait()
+        except queue.Empty:
+            self.batch = np.zeros(len(self.batch), dtype=RECORD_DTYPE)
+            self.extra_batches += 1
+        self.count = 0
+
+    def close(self):
+        """Write everything logged so far and close the file"""
+        self.flush()
+        self.pending.put(None)
+        self.writer.join()
+        self.file.close()
+
+    def summary(self):
+        return f"{self.written} events logged to {self.path}"
+
+    def _writer_loop(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            batch, count = item
+            if self.error is None:
+                try:
+                    self.file.write(batch[:count].tobytes())
+                    self.file.flush()
+                    self.written += count
+                except OSError as error:
+                    print(f"Event log stopped: {error}")
+                    self.error = error
+            self.free.put(batch)
+
+
+def open_log(path):
+    """Memory-map the records of a log file (read-only), or return None if it is not an event log"""
+    size = os.path.getsize(path)
+    if size < HEADER.size:
+        return None
+    with open(path, 'rb') as f:
+        magic, version, record_size = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION or record_size != RECORD_DTYPE.itemsize:
+        return None
+    records = (size - HEADER.size) // RECORD_DTYPE.itemsize
+    if not records:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER.size, shape=(records,))
+
+
+def add_counts(totals, values, minlength=0):
+    """Add np.bincount(values) into totals, growing totals as needed"""
+    counts = np.bincount(values, minlength=max(minlength, len(totals)))
+    counts[:len(totals)] += totals
+    return counts
+
+
+def log_paths(paths):
+    """Expand directories into the log files in them"""
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith('.zev'):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def analyze(paths, chunk_records=1 << 22):
+    """Aggregate every log in paths, a chunk of records at a time so memory stays flat however big they are"""
+    kinds = np.zeros(0, dtype=np.int64)
+    combos = np.zeros(0, dtype=np.int64)      # Kills by consecutive kills after the kill
+    multikills = np.zeros(0, dtype=np.int64)  # Kills by spiders killed at once
+    deaths = np.zeros((256, HOTSPOT_BINS), dtype=np.int64)  # Lives lost by level and screen column
+    level_times = []  # (levels, frames) arrays of LEVEL_CLEAR records
+    end_scores = []   # Final scores of finished runs
+    quit_scores = []
+    won = 0
+    files = 0
+    for path in log_paths(paths):
+        records = open_log(path)
+        if records is None:
+            print(f"Skipping {path}: not an event log")
+            continue
+        files += 1
+        for start in range(0, len(records), chunk_records):
+            chunk = records[start:start + chunk_records]
+            kind = chunk['kind']
+            kinds = add_counts(kinds, kind)
+
+            kills = chunk[kind == KILL]
+            combos = add_counts(combos, kills['value'])
+            multikills = add_counts(multikills, kills['count'])
+
+            lost = chunk[kind == LIFE_LOST]
+            columns = np.clip(lost['x'] // HOTSPOT_BIN_WIDTH, 0, HOTSPOT_BINS - 1)
+            deaths += np.bincount(lost['level'].astype(np.int64) * HOTSPOT_BINS + columns,
+                                  minlength=deaths.size).reshape(deaths.shape)
+
+            cleared = chunk[kind == LEVEL_CLEAR]
+            level_times.append((cleared['level'].astype(np.int64), cleared['value'].astype(np.int64)))
+
+            ended = chunk[kind == GAME_END]
+            end_scores.append(ended['score'])
+            won += int(np.count_nonzero(ended['count']))
+            quit_scores.append(chunk[kind == QUIT]['score'])
+
+    def percentiles(values):
+        if not len(values):
+            return {}
+        return {name: float(np.percentile(values, q)) for name, q in (('p50', 50), ('p90', 90), ('p99', 99))} | {
+            'max': int(values.max()), 'mean': round(float(values.mean()), 1)}
+
+    end_scores = np.concatenate(end_scores) if end_scores else np.zeros(0, dtype=np.int64)
+    quit_scores = np.concatenate(quit_scores) if quit_scores else np.zeros(0, dtype=np.int64)
+    levels = np.concatenate([levels for levels, _ in level_times]) if level_times else np.zeros(0, dtype=np.int64)
+    frames = np.concatenate([frames for _, frames in level_times]) if level_times else np.zeros(0, dtype=np.int64)
+
+    report = {
+        'files': files,
+        'events': {KIND_NAMES.get(kind, str(kind)): int(count) for kind, count in enumerate(kinds) if count},
+        'runs': {'finished': len(end_scores), 'won': won, 'quit': len(quit_scores)},
+        'final_score': percentiles(end_scores),
+        'combo_distribution': {int(combo): int(count) for combo, count in enumerate(combos) if count},
+        'multikill_distribution': {int(size): int(count) for size, count in enumerate(multikills) if count},
+        'deaths_by_level': {},
+        'level_seconds': {},
+    }
+    for level in np.flatnonzero(deaths.sum(axis=1)):
+        row = deaths[level]
+        hotspot = int(row.argmax())
+        report['deaths_by_level'][int(level)] = {
+            'deaths': int(row.sum()),
+            'hotspot_x': [hotspot * HOTSPOT_BIN_WIDTH, (hotspot + 1) * HOTSPOT_BIN_WIDTH],
+            'hotspot_share': round(float(row[hotspot] / row.sum()), 3),
+            'columns': row.tolist(),
+        }
+    for level in np.unique(levels):
+        seconds = frames[levels == level] / FRAMES_PER_SECOND
+        report['level_seconds'][int(level)] = {'clears': len(seconds), 'median': round(float(np.median(seconds)), 2),
+                                               'p90': round(float(np.percentile(seconds, 90)), 2)}
+    return report
+
+
+def print_report(report):
+    runs = report['runs']
+    print(f"{report['files']} log(s): {runs['finished']} finished runs ({runs['won']} won), {runs['quit']} quit")
+    print("events: " + ', '.join(f"{name} {count}" for name, count in report['events'].items()))
+    score = report['final_score']
+    if score:
+        print(f"final score p50 {score['p50']:.0f}  p90 {score['p90']:.0f}  p99 {score['p99']:.0f}  max {score['max']}")
+    combos = report['combo_distribution']
+    if combos:
+        total = sum(combos.values())
+        print("kills by combo: " + '  '.join(f"x{combo} {count / total:.1%}" for combo, count in list(combos.items())[:12]))
+    multikills = report['multikill_distribution']
+    if multikills:
+        print("kills by spiders stomped at once: " + '  '.join(f"{size}: {count}" for size, count in multikills.items()))
+    print(f"{'level':>5}{'deaths':>8}{'hotspot x':>12}{'share':>8}{'clears':>8}{'median s':>10}{'p90 s':>8}")
+    for level in sorted(set(report['deaths_by_level']) | set(report['level_seconds'])):
+        death = report['deaths_by_level'].get(level)
+        clears = report['level_seconds'].get(level)
+        hotspot = f"{death['hotspot_x'][0]}-{death['hotspot_x'][1]}" if death else '-'
+        print(f"{level:>5}{death['deaths'] if death else 0:>8}{hotspot:>12}"
+              f"{death['hotspot_share'] if death else 0:>8.0%}{clears['clears'] if clears else 0:>8}"
+              f"{clears['median'] if clears else 0:>10.1f}{clears['p90'] if clears else 0:>8.1f}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Summarize gameplay event logs written with --event-log")
+    parser.add_argument('paths', nargs='+', help='log files, or directories of .zev logs')
+    parser.add_argument('--chunk', type=int, default=1 << 22, help='records processed at a time')
+    parser.add_argument('--json', metavar='PATH', help='also write the full report as JSON to PATH')
+    args = parser.parse_args()
+    report = analyze(args.paths, args.chunk)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=1)
+
+
+if __name__ == "__main__":
+    main_cli()
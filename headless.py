@@ -0,0 +1,92 @@
+# Headless simulation runner: steps Game as fast as possible with no window, audio or frame pacing
+
+import os
+
+# The dummy drivers have to be selected before pygame initializes in main
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import time
+
+import main
+from controls import NO_INPUT, FrameInput
+from main import Game
+
+
+def chase_bot(game):
+    """Simple policy: walk towards the nearest spider and jump when close to it"""
+    if game.game_over:
+        return FrameInput(restart=True)
+    zach = game.zach
+    if game.swarm:
+        nearest = game.spiders.nearest(zach.rect.centerx)
+    else:
+        nearest = None
+        for spider in game.spiders:
+            if nearest is None or abs(spider.rect.centerx - zach.rect.centerx) < abs(nearest.rect.centerx - zach.rect.centerx):
+                nearest = spider
+    if nearest is None:
+        return NO_INPUT
+    dx = nearest.rect.centerx - zach.rect.centerx
+    return FrameInput(left=dx < -5, right=dx > 5, jump=abs(dx) < 60)
+
+
+def run_headless(frames, policy=chase_bot, seed=None, step_frames=1, spectators=None, event_log=None, **game_options):
+    """Create a seeded headless game, step it for a number of frames and return it.
+
+    step_frames > 1 fast-forwards: the policy is asked once per step of that many frames.
+    Each step's state is published to spectators (a spectate.SpectatorServer) if given,
+    and gameplay events are appended to event_log (an eventlog.EventLog) if given.
+    """
+    game = Game(headless=True, seed=seed, **game_options)
+    game.spectators = spectators
+    game.event_log = event_log
+    for _ in range(frames // step_frames):
+        game.step(policy(game), step_frames)
+        if spectators:
+            spectators.publish(game)
+    return game
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Run Zach's Spider Adventure without a display")
+    parser.add_argument('--frames', type=int, default=100000, help='number of simulation frames to run')
+    parser.add_argument('--seed', type=int, default=None, help='seed for spider placement and speeds')
+    parser.add_argument('--swarm', action='store_true', help='store spiders in a SpiderSwarm instead of sprites')
+    parser.add_argument('--spiders', type=int, default=main.SPIDERS_PER_LEVEL, help='spiders per level')
+    parser.add_argument('--step-frames', type=int, default=1, help='frames advanced per simulation step (fast-forward)')
+    parser.add_argument('--idle', action='store_true', help='only restart after game over instead of running the chase bot')
+    parser.add_argument('--spectate', metavar='ADDRESS', help='stream game state to spectators on host:port or a Unix socket path')
+    parser.add_argument('--event-log', metavar='PATH', help='append gameplay events to PATH (see eventlog.py)')
+    args = parser.parse_args()
+    
+    spectators = None
+    if args.spectate:
+        from spectate import SpectatorServer
+        spectators = SpectatorServer(args.spectate)
+    event_log = None
+    if args.event_log:
+        from eventlog import EventLog
+        event_log = EventLog(args.event_log)
+    policy = (lambda game: FrameInput(restart=True)) if args.idle else chase_bot
+    start = time.perf_counter()
+    game = run_headless(args.frames, policy=policy, seed=args.seed, step_frames=args.step_frames,
+                        spectators=spectators, event_log=event_log, swarm=args.swarm, spiders_per_level=args.spiders)
+    elapsed = time.perf_counter() - start
+    if spectators:
+        spectators.close()
+        print(spectators.summary())
+    if event_log:
+        if not game.game_over:
+            event_log.quit(game)
+        event_log.close()
+        print(event_log.summary())
+    
+    print(f"{args.frames} frames in {elapsed:.2f}s ({args.frames / elapsed:,.0f} frames/s)")
+    print(f"level {game.level}, score {game.score}, spiders defeated {game.total_spiders_defeated}, best combo {game.best_combo}")
+
+
+if __name__ == "__main__":
+    main_cli()
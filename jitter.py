@@ -0,0 +1,137 @@
+# Low-jitter runtime support: keeps garbage collection out of gameplay frames and meters per-frame allocations
+
+import gc
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+
+class GcController:
+    """Times every garbage collection and, when `manual`, decides when they may happen.
+
+    Manual mode turns automatic collection off. settle() then runs a full
+    collection and gc.freeze()s the survivors, so long-lived game objects are
+    never scanned again; the game calls it at natural pauses (startup, level
+    transitions, game over). tick() runs once a frame and only steps in, with
+    a cheap young-generation collection, if more than `young_limit` tracked
+    objects have piled up since, which a steady-state frame should never cause.
+    """
+    def __init__(self, manual=False, young_limit=50000):
+        self.manual = manual
+        self.young_limit = young_limit
+        self.collections = 0         # Collections of any kind since start
+        self.forced_collections = 0  # Young collections tick() had to run between pauses
+        self.last_pause_ms = 0.0
+        self.max_pause_ms = 0.0
+        self.total_pause_ms = 0.0
+        self.gameplay_pauses = 0     # Collections that ran outside settle()
+        self.settling = False
+        self.started = 0.0
+        gc.callbacks.append(self._on_gc)
+        if manual:
+            gc.disable()
+
+    def settle(self):
+        """In manual mode, collect everything now and freeze what survives; only call between gameplay frames"""
+        if not self.manual:
+            return  # Automatic collection keeps up on its own; a forced full collection would only add a pause
+        self.settling = True
+        gc.unfreeze()  # Objects frozen last time may be garbage by now (the previous level's sprites)
+        gc.collect()
+        self.settling = False
+        gc.freeze()
+
+    def tick(self):
+        if self.manual and gc.get_count()[0] > self.young_limit:
+            self.forced_collections += 1
+            gc.collect(0)
+
+    def close(self):
+        gc.callbacks.remove(self._on_gc)
+        if self.manual:
+            gc.unfreeze()
+            gc.enable()
+
+    def _on_gc(self, phase, info):
+        if phase == 'start':
+            self.started = time.perf_counter()
+            return
+        pause_ms = (time.perf_counter() - self.started) * 1000
+        self.collections += 1
+        if not self.settling:
+            self.gameplay_pauses += 1
+        self.last_pause_ms = pause_ms
+        self.max_pause_ms = max(self.max_pause_ms, pause_ms)
+        self.total_pause_ms += pause_ms
+
+    def stats_lines(self):
+        mode = 'manual' if self.manual else 'auto'
+        return [f"gc {mode}: {self.collections} runs ({self.gameplay_pauses} in play)",
+                f"gc pause last {self.last_pause_ms:.2f} max {self.max_pause_ms:.2f} ms"]
+
+
+class AllocationMeter:
+    """Per-frame allocation counts from tracemalloc, kept in a ring buffer like FrameProfiler's.
+
+    For each frame it records the memory blocks and bytes still allocated at
+    the end that were not at the start (what the garbage collector will
+    eventually have to deal with) and the peak transient bytes allocated on
+    top of the starting level. Tracing slows Python down several times over,
+    so this is a verification tool, not something to leave on while playing.
+
+    The game reuses its input, display list and draw rects, so a steady-state
+    frame retains nothing and its transient peak is a few hundred bytes of
+    interpreter temporaries (ints past 256, pygame's event list) rather than
+    anything the game builds; the reading itself accounts for 64 of them.
+    Key presses, kills and HUD changes still allocate in the frame they happen.
+    """
+    def __init__(self, capacity=1200):
+        self.retained_blocks = np.zeros(capacity, dtype=np.int64)
+        self.retained_bytes = np.zeros(capacity, dtype=np.int64)
+        self.transient_bytes = np.zeros(capacity, dtype=np.int64)
+        self.frames = 0
+        self.start_blocks = 0
+        self.start_bytes = 0
+        tracemalloc.start()
+
+    def begin_frame(self):
+        tracemalloc.reset_peak()
+        self.start_bytes = tracemalloc.get_traced_memory()[0]
+        self.start_blocks = sys.getallocatedblocks()
+
+    def end_frame(self):
+        blocks = sys.getallocatedblocks()
+        current, peak = tracemalloc.get_traced_memory()
+        slot = self.frames % len(self.retained_blocks)
+        self.retained_blocks[slot] = blocks - self.start_blocks
+        self.retained_bytes[slot] = current - self.start_bytes
+        self.transient_bytes[slot] = peak - self.start_bytes
+        self.frames += 1
+
+    def close(self):
+        tracemalloc.stop()
+
+    def summary(self):
+        """Share of frames with no retained growth, and p50/p99/max per measure over the ring buffer"""
+        n = min(self.frames, len(self.retained_blocks))
+        if not n:
+            return {}
+        report = {'no_retained_growth': round(float(np.mean(self.retained_blocks[:n] <= 0)), 4)}
+        for name in ('retained_blocks', 'retained_bytes', 'transient_bytes'):
+            values = getattr(self, name)[:n]
+            report[name] = {
+                'p50': float(np.percentile(values, 50)),
+                'p99': float(np.percentile(values, 99)),
+                'max': int(values.max()),
+            }
+        return report
+
+    def stats_lines(self):
+        summary = self.summary()
+        if not summary:
+            return []
+        return [f"no-growth frames {summary['no_retained_growth']:.1%}",
+                f"alloc p99 {summary['retained_blocks']['p99']:.0f} blocks, "
+                f"peak p50 {summary['transient_bytes']['p50']:.0f} B p99 {summary['transient_bytes']['p99']:.0f} B"]
@@ -5,32 +5,55 @@ import random
 import numpy as np
 import os
 import time
+import warnings
+from collections import OrderedDict
+
+from assets import AudioAssets
+from atlas import SurfaceAtlas
+from collision import SortedCellIndex, SpatialGrid, sweep_times
+from controls import NO_INPUT, FrameInput, KeyboardInput
+from jitter import GcController
+from music import MusicPlayer
+from render import DirtyRectRenderer
+from popups import PopupPool
+from profiler import FrameProfiler, ProfilerOverlay
+from scores import ScoreStore, read_high_score
+from spawn import place_spaced
+from snapshot import SnapshotFormat
+from textcache import GlyphAtlas, TextCache
+from voices import VoiceManager
 
 pygame.init()
 pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
 
-# Load sound files
-def load_sound(filename):
-    try:
-        sound_path = os.path.join('sound', filename)
-        return pygame.mixer.Sound(sound_path)
-    except:
-        print(f"Could not load sound file: {filename}")
-        return None
-
-# Load the kill sound files
-double_kill_sound = load_sound('doublekill.mp3')
-triple_kill_sound = load_sound('triplekills.mp3')
-monster_kill_sound = load_sound('monsterkill.mp3')
-ouch_sound = load_sound('ouch.mp3')
-gameover_sound = load_sound('gameover.mp3')
-
-# Load level and win sounds
-win_sound = load_sound('youwin.mp3')  # Use youwin.mp3 for victory
-
-# Function to load level sound dynamically
-def load_level_sound(level_num):
-    return load_sound(f'level{level_num}.mp3')
+# Sound files are loaded in the background by the asset manager (see Game.__init__)
+SOUND_DIR = 'sound'
+SOUND_CACHE_DIR = os.path.join(SOUND_DIR, '.pcm-cache')  # decoded PCM reused across launches
+
+# Kill sound files
+DOUBLE_KILL_SOUND = 'doublekill.mp3'
+TRIPLE_KILL_SOUND = 'triplekills.mp3'
+MONSTER_KILL_SOUND = 'monsterkill.mp3'
+OUCH_SOUND = 'ouch.mp3'
+GAMEOVER_SOUND = 'gameover.mp3'
+
+# Win sound
+WIN_SOUND = 'youwin.mp3'  # Use youwin.mp3 for victory
+
+# Short effects are decoded into Sounds; level, win and game over tracks are streamed as music
+SFX_FILES = [DOUBLE_KILL_SOUND, TRIPLE_KILL_SOUND, MONSTER_KILL_SOUND, OUCH_SOUND]
+FINAL_LEVEL = 10
+
+# Mixer channels reserved per sound category (music streams on its own, see MusicPlayer);
+# a category's sounds steal its channels by priority and never anyone else's
+VOICE_POOLS = {'announcer': 2, 'sfx': 6}
+SOUND_REPEAT_FRAMES = 3  # The same sound is not restarted within this many frames
+OUCH_PRIORITY = 2
+KILL_BEEP_PRIORITY = 1
+BONUS_BEEP_PRIORITY = 0
+
+def level_sound_name(level_num):
+    return f'level{level_num}.mp3'
 
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
@@ -45,11 +68,43 @@ FPS = 60
 GRAVITY = 0.8
 JUMP_SPEED = -18
 
+ZACH_WIDTH = 30
+ZACH_BLOCK_HEIGHT = 20              # Zach is this much taller per block (life)
+ZACH_MAX_BLOCKS = 3
+
+SPIDER_WIDTH = 25
+SPIDER_HEIGHT = 20
+SPIDERS_PER_LEVEL = 10
+SPIDER_SPEED_PER_LEVEL = 0.5        # spider speed added per level past the first
+SPIDER_MAX_BASE_SPEED = 3           # fastest speed a first-level spider can roll
+SPIDER_SPAWN_Y = SCREEN_HEIGHT - 80  # Spiders stand on top of the ground
+SPIDER_SPAWN_MIN_X = 50
+SPIDER_SPAWN_MAX_X = SCREEN_WIDTH - 50
+SPIDER_SPAWN_SPACING = 50           # spiders start at least this far apart when the level has room
+COLLISION_CELL_SIZE = 64            # broadphase grid cell size in pixels
+
 # Scoring system constants
 BASE_POINTS = 100                   # points per spider
 CONSEC_BONUS_PER = 0.10             # +10% per consecutive-air kill beyond the first
 MULTIKILL_MULTS = {1:1.0, 2:1.5, 3:2.0, 4:3.0}  # 4+ uses 3.0
+HIGH_SCORE_FILE = 'highscore.txt'
+SCOREBOARD_FILE = 'scoreboard.json'
+SCOREBOARD_SIZE = 10                # best runs kept in the scoreboard
+HIGH_SCORE_FLUSH_SECONDS = 5.0      # a beaten high score is saved at most this often mid-game
 COMBO_TIMEOUT_FRAMES = None         # set to an int (e.g., 90) to enable time-based combo reset; None to disable
+POPUP_COLOR = (255, 170, 0)         # bonus popups fade out from this color
+POPUP_CAPACITY = 64                 # live popups before the oldest gets recycled
+
+LEVEL_TRANSITION_FRAMES = int(1.5 * FPS)  # "Level N" screen length, counted in simulation frames
+
+# Frame phases timed by the profiler, in loop order
+PROFILE_PHASES = ['events', 'level_transition', 'sprites', 'scoring', 'collisions', 'draw', 'flip', 'idle']
+
+# Fixed-step loop settings
+STEP_SECONDS = 1 / FPS        # The simulation always advances in steps of this length
+MAX_CATCH_UP_STEPS = 5        # Most steps run before a frame is drawn; older backlog is dropped
+MAX_FRAME_SECONDS = 0.25      # Longer stalls (window drags, breakpoints) count as this long
+INTERPOLATION_SNAP = 100      # Moves longer than this in one step are drawn as jumps, not tweened
 
 def generate_kill_sound(pitch_multiplier=1.0):
     """Generate a simple beep sound with variable pitch"""
@@ -58,15 +113,15 @@ def generate_kill_sound(pitch_multiplier=1.0):
     frequency = 440 * pitch_multiplier  # A4 note scaled by pitch
     
     frames = int(duration * sample_rate)
-    arr = np.zeros((frames, 2))
+    i = np.arange(frames, dtype=np.float64)
     
-    for i in range(frames):
-        wave = np.sin(2 * np.pi * frequency * i / sample_rate)
-        # Add envelope to prevent clicks
-        envelope = min(i / (frames * 0.1), 1.0, (frames - i) / (frames * 0.1))
-        arr[i] = [wave * envelope * 0.3, wave * envelope * 0.3]
+    wave = np.sin(2 * np.pi * frequency * i / sample_rate)
+    # Add envelope to prevent clicks (linear ramp in, flat, linear ramp out)
+    ramp = frames * 0.1
+    envelope = np.minimum(np.minimum(i / ramp, 1.0), (frames - i) / ramp)
+    mono = wave * envelope * 0.3
     
-    arr = (arr * 32767).astype(np.int16)
+    arr = (np.column_stack((mono, mono)) * 32767).astype(np.int16)
     sound = pygame.sndarray.make_sound(arr)
     return sound
 
@@ -76,55 +131,94 @@ def generate_multi_kill_sound(kill_count):
     sample_rate = 22050
     
     frames = int(duration * sample_rate)
-    arr = np.zeros((frames, 2))
+    i = np.arange(frames, dtype=np.float64)
     
     # Create a chord with multiple frequencies based on kill count
     base_freq = 220  # Lower base frequency for richness
-    frequencies = [base_freq * (1.0 + i * 0.25) for i in range(min(kill_count, 4))]  # Cap at 4 harmonics
+    frequencies = np.array([base_freq * (1.0 + n * 0.25) for n in range(min(kill_count, 4))])  # Cap at 4 harmonics
     
-    for i in range(frames):
-        wave = 0
-        for freq in frequencies:
-            wave += np.sin(2 * np.pi * freq * i / sample_rate) / len(frequencies)
-        
-        # Create a decay envelope for dramatic effect
-        envelope = max(0, 1.0 - (i / frames) ** 0.5) * 0.4
-        arr[i] = [wave * envelope, wave * envelope]
+    # One row per chord note, summed down to a single waveform
+    phases = np.outer(frequencies, 2 * np.pi * i / sample_rate)
+    wave = np.sin(phases).sum(axis=0) / len(frequencies)
     
-    arr = (arr * 32767).astype(np.int16)
+    # Create a decay envelope for dramatic effect
+    envelope = np.maximum(0, 1.0 - (i / frames) ** 0.5) * 0.4
+    mono = wave * envelope
+    
+    arr = (np.column_stack((mono, mono)) * 32767).astype(np.int16)
     sound = pygame.sndarray.make_sound(arr)
     return sound
 
+class SoundCache:
+    """Bounded LRU cache of ready-to-play synthesized sounds"""
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.sounds = OrderedDict()
+    
+    def get(self, key, factory):
+        sound = self.sounds.get(key)
+        if sound is not None:
+            self.sounds.move_to_end(key)
+            return sound
+        sound = factory()
+        self.sounds[key] = sound
+        if len(self.sounds) > self.max_size:
+            self.sounds.popitem(last=False)  # Evict least recently used
+        return sound
+
+KILL_PITCH_STEP = 0.05              # kill beep pitches are quantized to this step before caching
+WARM_COMBO_LENGTH = 20              # combo lengths whose kill beeps are synthesized at startup
+kill_sound_cache = SoundCache(max_size=48)
+
+def get_kill_sound(pitch_multiplier=1.0):
+    """Return a cached kill beep for the quantized pitch, synthesizing only on a miss"""
+    step = round(pitch_multiplier / KILL_PITCH_STEP)
+    return kill_sound_cache.get(('kill', step), lambda: generate_kill_sound(step * KILL_PITCH_STEP))
 
-def load_high_score():
-    """Load high score from file, return 0 if file doesn't exist"""
-    try:
-        with open('highscore.txt', 'r') as f:
-            return int(f.read().strip())
-    except (FileNotFoundError, ValueError):
-        return 0
+def get_multi_kill_sound(kill_count):
+    """Return a cached multi-kill chord (chords stop changing past 4 kills)"""
+    chord_size = min(kill_count, 4)
+    return kill_sound_cache.get(('multi', chord_size), lambda: generate_multi_kill_sound(chord_size))
 
-def save_high_score(score):
-    """Save high score to file"""
-    try:
-        with open('highscore.txt', 'w') as f:
-            f.write(str(score))
-    except:
-        pass  # Fail silently if can't write file
+def warm_kill_sounds():
+    """Pre-synthesize every kill sound the combo system can reach in normal play"""
+    for consecutive_kills in range(1, WARM_COMBO_LENGTH + 1):
+        get_kill_sound(1.0 + (consecutive_kills - 1) * 0.2)
+    get_kill_sound(1.5)  # Big multikill bonus beep
+    for kill_count in range(2, 5):
+        get_multi_kill_sound(kill_count)  # Stand-ins for the announcer clips
+
+sprite_atlas = SurfaceAtlas()
+
+def block_image(width, height, color):
+    """Return the shared atlas surface for a solid block of the given size and color"""
+    def build():
+        surface = pygame.Surface((width, height))
+        surface.fill(color)
+        return surface
+    return sprite_atlas.get(('block', width, height, color), build)
+
+def warm_sprite_images():
+    """Build every sprite surface up front: the spider and each of Zach's heights"""
+    block_image(SPIDER_WIDTH, SPIDER_HEIGHT, RED)
+    for blocks in range(1, ZACH_MAX_BLOCKS + 1):
+        block_image(ZACH_WIDTH, blocks * ZACH_BLOCK_HEIGHT, BLUE)
 
 class Zach(pygame.sprite.Sprite):
     def __init__(self):
         super().__init__()
         self.blocks = 2  # Start with 2 blocks (2 lives)
-        self.block_height = 20  # Height of each block
-        self.max_blocks = 3  # Maximum number of blocks Zach can grow to
+        self.block_height = ZACH_BLOCK_HEIGHT  # Height of each block
+        self.max_blocks = ZACH_MAX_BLOCKS  # Maximum number of blocks Zach can grow to
         self.update_sprite()
         self.rect.x = 100
         self.rect.bottom = SCREEN_HEIGHT - 60  # Position on ground like spiders
         self.vel_y = 0
+        self.launch_vel_y = 0  # Vertical speed at the start of the latest update's motion
         self.on_ground = False
         self.speed = 5
         self.consecutive_kills = 0
+        self.kills_before_landing = None  # Combo the latest update's landing reset, if it landed
         self.invincible_timer = 0
         self.invincible_duration = 3 * FPS  # 3 seconds at 60 FPS
         self.just_lost_life = False  # Flag to prevent physics override after losing life
@@ -135,9 +229,7 @@ class Zach(pygame.sprite.Sprite):
         # Store current position before updating sprite
         old_bottom = getattr(self.rect, 'bottom', None) if hasattr(self, 'rect') else None
         
-        total_height = self.blocks * self.block_height
-        self.image = pygame.Surface((30, total_height))
-        self.image.fill(BLUE)
+        self.image = block_image(ZACH_WIDTH, self.blocks * self.block_height, BLUE)
         
         # Create new rect but preserve position if we had one
         new_rect = self.image.get_rect()
@@ -171,22 +263,26 @@ class Zach(pygame.sprite.Sprite):
         else:
             return False  # Dead
 
-    def update(self):
+    def update(self, controls=None, frames=1):
+        """Move Zach by `frames` frames of input and physics (several at once when fast-forwarding)"""
+        if controls is None:
+            controls = FrameInput.from_keyboard()
+        self.kills_before_landing = None
+        
         # Update invincibility timer
         if self.invincible_timer > 0:
-            self.invincible_timer -= 1
+            self.invincible_timer = max(0, self.invincible_timer - frames)
         
         # Update ground lock timer
         if self.ground_lock_timer > 0:
-            self.ground_lock_timer -= 1
+            self.ground_lock_timer = max(0, self.ground_lock_timer - frames)
             # Force Zach to stay on ground while timer is active
             self._set_ground_position()
             # Allow horizontal movement even when locked to ground
-            keys = pygame.key.get_pressed()
-            if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-                self.rect.x -= self.speed
-            if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-                self.rect.x += self.speed
+            if controls.left:
+                self.rect.x -= self.speed * frames
+            if controls.right:
+                self.rect.x += self.speed * frames
             return  # Skip vertical physics while locked to ground
         
         # Reset the just_lost_life flag after one frame
@@ -196,30 +292,34 @@ class Zach(pygame.sprite.Sprite):
             self._set_ground_position()
             return  # Skip physics update for one frame after losing life
         
-        keys = pygame.key.get_pressed()
-        
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            self.rect.x -= self.speed
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            self.rect.x += self.speed
-        if (keys[pygame.K_SPACE] or keys[pygame.K_UP] or keys[pygame.K_w]) and self.on_ground:
+        if controls.left:
+            self.rect.x -= self.speed * frames
+        if controls.right:
+            self.rect.x += self.speed * frames
+        if controls.jump and self.on_ground:
             self.vel_y = JUMP_SPEED
             self.on_ground = False
 
-        self.vel_y += GRAVITY
-        self.rect.y += self.vel_y
+        self.launch_vel_y = self.vel_y
+        self.fall(frames)
 
         if self.rect.bottom >= SCREEN_HEIGHT - 60:
             self.rect.bottom = SCREEN_HEIGHT - 60
             self.vel_y = 0
             if not self.on_ground:  # Just landed
+                self.kills_before_landing = self.consecutive_kills
                 self.consecutive_kills = 0  # Reset combo when landing
             self.on_ground = True
 
         if self.rect.x < 0:
             self.rect.x = 0
-        if self.rect.x > SCREEN_WIDTH - 30:
-            self.rect.x = SCREEN_WIDTH - 30
+        if self.rect.x > SCREEN_WIDTH - ZACH_WIDTH:
+            self.rect.x = SCREEN_WIDTH - ZACH_WIDTH
+
+    def fall(self, frames):
+        """Move under gravity for `frames` frames, applied once per frame and summed in closed form"""
+        self.rect.y += self.vel_y * frames + GRAVITY * frames * (frames + 1) / 2
+        self.vel_y += GRAVITY * frames
 
     def is_invincible(self):
         return self.invincible_timer > 0
@@ -237,24 +337,37 @@ class Zach(pygame.sprite.Sprite):
         """Set Zach to ground position with proper physics state"""
         self.rect.bottom = SCREEN_HEIGHT - 60
         self.vel_y = 0
+        self.launch_vel_y = 0
         self.on_ground = True
 
+def roll_spider_motion(level, rng=random, speed_per_level=SPIDER_SPEED_PER_LEVEL):
+    """Pick a new spider's speed and starting direction for the given level"""
+    # Speed increases with level: base speed 1-3, +0.5 per level
+    base_speed = rng.randint(1, 3)
+    level_bonus = (level - 1) * speed_per_level
+    speed = base_speed + level_bonus
+    direction = rng.choice([-1, 1])
+    return speed, direction
+
+def roll_spawn_xs(count, rng=random):
+    """Pick spawn x positions for a level's spiders, at least SPIDER_SPAWN_SPACING apart when they fit.
+
+    Returns (xs, spacing); a spacing below SPIDER_SPAWN_SPACING means the
+    screen was too crowded and the spiders had to be packed closer.
+    """
+    return place_spaced(count, SPIDER_SPAWN_MIN_X, SPIDER_SPAWN_MAX_X, SPIDER_SPAWN_SPACING, rng)
+
 class Spider(pygame.sprite.Sprite):
-    def __init__(self, x, y, level=1):
+    def __init__(self, x, y, level=1, rng=random):
         super().__init__()
-        self.image = pygame.Surface((25, 20))
-        self.image.fill(RED)
+        self.image = block_image(SPIDER_WIDTH, SPIDER_HEIGHT, RED)  # Shared by every spider
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
-        # Speed increases with level: base speed 1-3, +0.5 per level
-        base_speed = random.randint(1, 3)
-        level_bonus = (level - 1) * 0.5
-        self.speed = base_speed + level_bonus
-        self.direction = random.choice([-1, 1])
+        self.speed, self.direction = roll_spider_motion(level, rng)
 
-    def update(self):
-        self.rect.x += self.speed * self.direction
+    def update(self, frames=1):
+        self.rect.x += self.speed * self.direction * frames
         
         # Check boundaries and bounce back
         if self.rect.left <= 0:
@@ -264,43 +377,247 @@ class Spider(pygame.sprite.Sprite):
             self.rect.right = SCREEN_WIDTH
             self.direction *= -1
 
-class Game:
+class SwarmSpider:
+    """Lightweight handle to one spider in a SpiderSwarm, usable where a Spider sprite is expected"""
+    __slots__ = ('swarm', 'index')
+    
+    def __init__(self, swarm, index):
+        self.swarm = swarm
+        self.index = index
+    
+    @property
+    def rect(self):
+        # A fresh Rect built from the arrays; moving it does not move the spider
+        return pygame.Rect(int(self.swarm.x[self.index]), int(self.swarm.y[self.index]), SPIDER_WIDTH, SPIDER_HEIGHT)
+    
+    def kill(self):
+        self.swarm.kill(self.index)
+
+class SpiderSwarm:
+    """Struct-of-arrays spider store that moves and bounces every spider in one NumPy step"""
     def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Zach's Spider Adventure")
+        # All spiders look the same, so they share one surface
+        self.image = block_image(SPIDER_WIDTH, SPIDER_HEIGHT, RED)
+        self.grid = SortedCellIndex(COLLISION_CELL_SIZE, SPIDER_WIDTH, SPIDER_HEIGHT, SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.reset(0)
+    
+    def reset(self, capacity):
+        """Drop every spider and make room for `capacity` new ones"""
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.speed = np.zeros(capacity)
+        self.direction = np.zeros(capacity)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.previous_x = None
+        self.grid.reset(capacity)
+        self.grid_stale = False  # Spawned spiders are indexed in bulk on first use
+    
+    def spawn(self, x, y, level=1, rng=random):
+        """Add a spider, rolling its speed and direction exactly like Spider.__init__"""
+        i = self.count
+        self.x[i] = x
+        self.y[i] = y
+        self.speed[i], self.direction[i] = roll_spider_motion(level, rng)
+        self.alive[i] = True
+        self.count += 1
+        self.grid_stale = True
+    
+    def kill(self, index):
+        self.alive[index] = False
+        if not self.grid_stale:
+            self.grid.remove(index)
+    
+    def refresh_grid(self):
+        if self.grid_stale:
+            n = self.count
+            self.grid.rebuild(self.x[:n], self.y[:n], self.alive[:n])
+            self.grid_stale = False
+    
+    def update(self, frames=1):
+        """Move every spider `frames` frames and bounce the ones that reached a screen edge"""
+        n = self.count
+        x = self.x[:n]
+        direction = self.direction[:n]
+        
+        # Rect coordinates are integers and pygame rounds half away from zero on
+        # assignment, so do the same to stay frame-for-frame identical to Spider
+        x += self.speed[:n] * direction * frames
+        x += np.copysign(0.5, x)
+        np.trunc(x, out=x)
+        
+        # Check boundaries and bounce back
+        hit_left = x <= 0
+        hit_right = x >= SCREEN_WIDTH - SPIDER_WIDTH
+        hit_right &= ~hit_left
+        x[hit_left] = 0
+        x[hit_right] = SCREEN_WIDTH - SPIDER_WIDTH
+        np.negative(direction, out=direction, where=hit_left | hit_right)
+        
+        # Keep the broadphase grid in step with the spiders that changed cell
+        if not self.grid_stale:
+            self.grid.sync(x, self.y[:n], self.alive[:n])
+    
+    def alive_indices(self):
+        return np.flatnonzero(self.alive[:self.count])
+    
+    def collide(self, rect):
+        """Return handles for the live spiders overlapping rect, in spawn order like spritecollide"""
+        # Only the spiders in grid cells near rect get the exact overlap test
+        self.refresh_grid()
+        candidates = self.grid.query(rect)
+        x = self.x[candidates]
+        y = self.y[candidates]
+        hits = (x < rect.right) & (x + SPIDER_WIDTH > rect.left) & (y < rect.bottom) & (y + SPIDER_HEIGHT > rect.top)
+        return [SwarmSpider(self, i) for i in candidates[hits].tolist()]
+    
+    def nearest(self, x):
+        """Return a handle for the live spider whose center is horizontally closest to x"""
+        indices = self.alive_indices()
+        if len(indices) == 0:
+            return None
+        distance = np.abs(self.x[indices] + SPIDER_WIDTH // 2 - x)
+        return SwarmSpider(self, int(indices[np.argmin(distance)]))
+    
+    def capture_positions(self):
+        """Remember the current x positions so rects() can interpolate from them after the next update"""
+        self.previous_x = self.x[:self.count].copy()
+    
+    def rects(self, alpha=1.0):
+        """Return a Rect for every live spider, alpha of the way from the captured positions to the current ones"""
+        indices = self.alive_indices()
+        xs = self.x[indices]
+        if alpha < 1.0 and self.previous_x is not None and len(self.previous_x) == self.count:
+            previous = self.previous_x[indices]
+            moved = xs - previous
+            xs = np.where(np.abs(moved) <= INTERPOLATION_SNAP, previous + moved * alpha, xs)
+        return [pygame.Rect(x, y, SPIDER_WIDTH, SPIDER_HEIGHT)
+                for x, y in zip(xs.astype(int).tolist(), self.y[indices].astype(int).tolist())]
+    
+    def display_items(self, alpha=1.0):
+        """Return (key, surface, rect, stamp) display list items for the live spiders"""
+        image = self.image
+        indices = self.alive_indices().tolist()
+        return [(('spider', i), image, rect, image) for i, rect in zip(indices, self.rects(alpha))]
+    
+    def __iter__(self):
+        return (SwarmSpider(self, i) for i in self.alive_indices().tolist())
+    
+    def __len__(self):
+        return int(np.count_nonzero(self.alive[:self.count]))
+
+class Game:
+    def __init__(self, headless=False, swarm=False, spiders_per_level=SPIDERS_PER_LEVEL, dirty_rects=False, seed=None,
+                 vsync=False, low_jitter=False):
+        # Swarm games keep spiders in a SpiderSwarm instead of one sprite per spider
+        self.swarm = swarm
+        self.spiders_per_level = spiders_per_level
+        self.spawn_spacing = SPIDER_SPAWN_SPACING  # How far apart the level's spiders spawned (less when crowded)
+        # Every random roll in the game comes from this generator, so a seed plus
+        # the per-frame inputs reproduce a run exactly
+        self.seed = seed if seed is not None else random.randrange(1 << 63)
+        self.rng = random.Random(self.seed)
+        self.input_log = None  # Set to a replay.InputLog to record every step's input
+        self.renderer = None
+        self.assets = None
+        self.music = None
+        self.voices = None
+        self.profiler = None
+        self.profiler_overlay = None
+        self.scores = None
+        self.recorder = None  # Set to a capture.FrameRecorder to record every drawn frame
+        self.spectators = None  # Set to a spectate.SpectatorServer to stream every frame's state
+        self.event_log = None  # Set to an eventlog.EventLog to log kills, lost lives, level times and final scores
+        self.allocation_meter = None  # Set to a jitter.AllocationMeter to count allocations per frame
+        # Collection pauses are timed in windowed games; low-jitter games also
+        # hold collections back until level transitions and game over
+        self.gc_control = GcController(manual=low_jitter) if low_jitter or not headless else None
+        # Sprite positions before the latest step, for drawing between steps in the fixed-step
+        # loop and for sweeping collisions through steps longer than a frame
+        self.previous_positions = None  # sprite -> Rect, refreshed in place
+        self.step_frames = 1  # Frames the latest step advanced
+        self.settle_pending = False  # Whether the next step should run gc_control.settle()
+        self.skipped_steps = 0  # Simulation steps dropped because the fixed-step loop fell too far behind
+        # Headless games never open a window, play audio or touch the high score file
+        if headless:
+            self.screen = None
+            self.keyboard = None
+        else:
+            self.screen = self.open_window(vsync)
+            self.keyboard = KeyboardInput()  # The run loops' input, kept up to date by poll_events()
+            sprite_atlas.convert_all()  # Anything built before the window existed
+            pygame.display.set_caption("Zach's Spider Adventure")
+            self.background = self.build_background()
+            # Dirty-rect games repaint only what changed instead of the whole screen
+            if dirty_rects:
+                self.renderer = DirtyRectRenderer(self.screen, self.background)
+            # High scores are saved from a background thread, never from the game loop
+            self.scores = ScoreStore(HIGH_SCORE_FILE, SCOREBOARD_FILE, top_n=SCOREBOARD_SIZE,
+                                     flush_interval=HIGH_SCORE_FLUSH_SECONDS)
+            # Per-phase frame timings; F3 shows the overlay and F4 exports them
+            self.profiler = FrameProfiler(PROFILE_PHASES, budget_ms=1000 / FPS)
+            # Start loading audio off the game thread: effects are decoded, music is only read
+            self.assets = AudioAssets(SOUND_DIR, SOUND_CACHE_DIR)
+            self.assets.prefetch(SFX_FILES)
+            self.music = MusicPlayer(SOUND_DIR)
+            self.music.prefetch([level_sound_name(1)])
+            self.voices = VoiceManager(VOICE_POOLS, repeat_frames=SOUND_REPEAT_FRAMES)
         self.clock = pygame.time.Clock()
         self.font = pygame.font.Font(None, 74)
         self.small_font = pygame.font.Font(None, 36)
+        # Rendered text is reused until its string changes; the countdown changes
+        # every frame, so its digits come from a pre-rendered atlas instead
+        self.text_cache = TextCache(max_size=256)
+        self.countdown_glyphs = GlyphAtlas(self.small_font, "0123456789.s", BLACK)
+        self.hud_strings = {}  # HUD key -> (value, text), so unchanged values are not reformatted
+        # The display list is rebuilt every frame from entries and rects kept per key, and blit pairs
+        # for the full redraw, so drawing a frame allocates no lists, tuples or rects
+        self.display_list = []
+        self.blit_list = []
+        self.display_entries = {}  # key -> ([key, surface, rect, stamp], [surface, rect])
         self.level = 1
+        self.frame = 0  # Frames simulated since the run started
+        self.level_start_frame = 0
         
         # Scoring system state
         self.score = 0
         self.best_combo = 0
-        self.high_score = load_high_score()
+        self.high_score = self.scores.high_score if self.scores else read_high_score(HIGH_SCORE_FILE)
         self.combo_timer = 0
-        self.floating_texts = []  # List of floating text popups
+        
+        # Synthesize kill sounds and build sprite surfaces up front so a kill or life change never does it mid-frame
+        if not headless:
+            warm_kill_sounds()
+        warm_sprite_images()
+        # Floating score popups, faded out over their lifetime
+        self.popups = PopupPool(self.small_font, POPUP_COLOR, capacity=POPUP_CAPACITY)
         
         # Track spiders defeated across all levels
         self.total_spiders_defeated = 0
         
         # Level transition state
         self.level_transition = False
-        self.level_transition_start = 0
-        self.level_transition_duration = 1.5  # seconds
+        self.level_transition_frames = 0  # Frames left on the "Level N" screen
         self.level_sound_played = False  # Track if level start sound has been played
         
         # Game completion state
         self.game_won = False
         
+        # Fixed-size save/restore of the simulation state, for retry, rewind and bot search
+        self.snapshot_format = SnapshotFormat(spiders_per_level)
+        
         self.reset_game()
+        if self.gc_control:
+            self.gc_control.settle()  # Freeze everything built at startup before the first frame
 
     def reset_game(self):
         self.level = 1
+        self.frame = 0
         # Reset scoring state but preserve high score
         self.score = 0
         self.best_combo = 0
         self.combo_timer = 0
-        self.floating_texts = []
+        self.popups.clear()
         # Reset total spiders defeated when starting a new game
         self.total_spiders_defeated = 0
         # Reset level transition state
@@ -310,40 +627,40 @@ class Game:
         self.game_won = False
         self.setup_level()
         # Play level start sound for level 1
-        level_sound = load_level_sound(self.level)
-        if level_sound:
-            level_sound.play()
+        self.play_level_sound()
 
     def setup_level(self):
         self.zach = Zach()
         self.zach.start_invincibility()  # Start invincible for 3 seconds
         self.all_sprites = pygame.sprite.Group()
-        self.spiders = pygame.sprite.Group()
+        if self.swarm:
+            self.spiders = SpiderSwarm()
+            self.spiders.reset(self.spiders_per_level)
+        else:
+            self.spiders = pygame.sprite.Group()
+            self.spider_sprites = []  # Every spider of the level in spawn order, dead or alive
+            self.spider_grid = SpatialGrid(COLLISION_CELL_SIZE, SPIDER_WIDTH, SPIDER_HEIGHT)
         self.all_sprites.add(self.zach)
         
-        for i in range(10):
-            # Ensure spiders are spread out more evenly
-            attempts = 0
-            while attempts < 20:  # Try up to 20 times to find a good position
-                x = random.randint(50, SCREEN_WIDTH - 50)
-                y = SCREEN_HEIGHT - 80  # Position spiders on top of ground
-                
-                # Check if this position is too close to existing spiders
-                too_close = False
-                for existing_spider in self.spiders:
-                    if abs(x - existing_spider.rect.x) < 50:  # Minimum 50 pixels apart
-                        too_close = True
-                        break
-                
-                if not too_close:
-                    break
-                attempts += 1
-            
-            spider = Spider(x, y, self.level)
-            self.spiders.add(spider)
-            self.all_sprites.add(spider)
+        spawn_xs, self.spawn_spacing = roll_spawn_xs(self.spiders_per_level, self.rng)
+        if self.spawn_spacing < SPIDER_SPAWN_SPACING:
+            # Shown once per process for each spider count, however many games and levels set up
+            warnings.warn(f"{self.spiders_per_level} spiders don't fit {SPIDER_SPAWN_SPACING}px apart, "
+                          f"spawning them {self.spawn_spacing}px apart")
+        y = SPIDER_SPAWN_Y
+        for x in spawn_xs:
+            if self.swarm:
+                self.spiders.spawn(x, y, self.level, self.rng)
+            else:
+                spider = Spider(x, y, self.level, self.rng)
+                self.spiders.add(spider)
+                self.spider_sprites.append(spider)
+                self.all_sprites.add(spider)
+                self.spider_grid.insert(spider, x, y)
         
+        self.display_entries.clear()  # Drop the last level's sprites
         self.spiders_defeated = 0
+        self.level_start_frame = self.frame
         self.game_over = False
         self.zach_alive = True
 
@@ -351,23 +668,58 @@ class Game:
         self.level += 1
         # Start level transition
         self.level_transition = True
-        self.level_transition_start = time.time()
+        self.level_transition_frames = LEVEL_TRANSITION_FRAMES
         self.level_sound_played = False  # Reset sound flag for new level
     
-    def check_level_transition(self):
+    def check_level_transition(self, frames=1):
         """Check if level transition is complete and setup new level if needed"""
         if self.level_transition:
             # Play level start sound if not already played
             if not self.level_sound_played:
-                level_sound = load_level_sound(self.level)
-                if level_sound:
-                    level_sound.play()
+                self.play_level_sound()
                 self.level_sound_played = True
             
-            elapsed = time.time() - self.level_transition_start
-            if elapsed >= self.level_transition_duration:
+            self.level_transition_frames -= frames
+            if self.level_transition_frames <= 0:
                 self.level_transition = False
                 self.setup_level()
+    
+    def play_sound(self, sound, category='sfx', priority=0):
+        """Play a sound effect on its category's channels unless it failed to load or the game is headless"""
+        if sound and self.voices:
+            self.voices.play(sound, category, priority)
+    
+    def sound(self, name):
+        """Return a loaded sound effect, or None while it is still loading in the background"""
+        if self.assets is None:
+            return None
+        return self.assets.get(name, wait=False)
+    
+    def play_music(self, name, upcoming):
+        """Stream a music track (unless headless) and start reading the tracks that can follow it"""
+        if self.music:
+            self.music.play(name)
+            self.music.prefetch(upcoming)
+    
+    def play_level_sound(self):
+        """Play the current level's start track and prefetch whatever can come next"""
+        if self.level < FINAL_LEVEL:
+            upcoming = [level_sound_name(self.level + 1), GAMEOVER_SOUND]
+        else:
+            upcoming = [WIN_SOUND, GAMEOVER_SOUND]
+        self.play_music(level_sound_name(self.level), upcoming)
+    
+    def update_high_score(self):
+        """Raise the high score to the current score and queue a save if it was beaten"""
+        if self.score > self.high_score:
+            self.high_score = self.score
+            if self.scores:
+                self.scores.submit_high_score(self.high_score)
+    
+    def record_run(self):
+        """Add the finished run to the scoreboard and save it right away"""
+        if self.scores:
+            self.scores.record_run(self.score, self.best_combo, self.level)
 
     def handle_collisions(self):
         if not self.zach_alive:
@@ -377,19 +729,33 @@ class Game:
         if self.zach.ground_lock_timer > 0:
             return
             
-        collisions = pygame.sprite.spritecollide(self.zach, self.spiders, False)
+        contacts = self.spider_contacts()
         
-        if not collisions:
+        if not contacts:
             return
-            
+        
+        # Everything touched within a frame of the first contact resolves together, as in a one-frame step
+        first_contact = contacts[0][1]
+        contact_window = first_contact + 1 / self.step_frames
+        # The frame of the step the first contact happened in
+        contact_frame = min(self.step_frames, int(first_contact * self.step_frames) + 1)
+        
         # Check all collisions first to see if any are kills vs damage
         spiders_to_kill = []
         zach_takes_damage = False
         
-        for spider in collisions:
-            zach_bottom = self.zach.rect.bottom
+        for spider, time_of_impact in contacts:
+            if time_of_impact >= contact_window:
+                break
+            if time_of_impact < 1.0:
+                # Judge a swept hit by where Zach was when it happened, not where the step left him, and
+                # by his speed at the end of that frame like a one-frame step would
+                zach_bottom = self.sweep_start().bottom + (self.zach.rect.y - self.sweep_start().y) * time_of_impact
+                zach_falling = self.zach.launch_vel_y + GRAVITY * contact_frame > 0
+            else:
+                zach_bottom = self.zach.rect.bottom
+                zach_falling = self.zach.vel_y > 0
             spider_center_y = spider.rect.centery
-            zach_falling = self.zach.vel_y > 0
             
             # Check if Zach is jumping on the spider from above
             if zach_bottom < spider_center_y + 10 and zach_falling:
@@ -402,24 +768,25 @@ class Game:
         if zach_takes_damage:
             if not self.zach.is_invincible():
                 # Play ouch sound when Zach gets hurt
-                if ouch_sound:
-                    ouch_sound.play()
+                self.play_sound(self.sound(OUCH_SOUND), priority=OUCH_PRIORITY)
                 
                 # Zach loses a life from side collision
                 if not self.zach.lose_life():
                     # Zach is dead (height reached 1 and lost another life)
-                    if gameover_sound:
-                        gameover_sound.play()
-                    # Save high score on game over
-                    if self.score > self.high_score:
-                        self.high_score = self.score
-                        save_high_score(self.high_score)
+                    self.play_music(GAMEOVER_SOUND, [level_sound_name(1)])
+                    # Save high score and scoreboard on game over
+                    self.update_high_score()
+                    self.record_run()
                     self.zach_alive = False
                     self.zach.kill()
                     self.game_over = True
                 else:
                     # Zach survived but lost a life - start invincibility
                     self.zach.start_invincibility()
+                if self.event_log:
+                    self.event_log.life_lost(self)
+                    if self.game_over:
+                        self.event_log.game_end(self)
             # If invincible, Zach survives but no sound plays
         elif spiders_to_kill:
             # Kill all spiders Zach jumped on
@@ -429,8 +796,21 @@ class Game:
             avg_x = sum(spider.rect.centerx for spider in spiders_to_kill) // len(spiders_to_kill)
             avg_y = sum(spider.rect.centery for spider in spiders_to_kill) // len(spiders_to_kill)
             
+            if first_contact < 1.0:
+                # Bounce off the spiders from where Zach met them, not from past them
+                start = self.sweep_start()
+                self.zach.rect.x = round(start.x + (self.zach.rect.x - start.x) * first_contact)
+                self.zach.rect.y = round(start.y + (self.zach.rect.y - start.y) * first_contact)
+                if self.zach.kills_before_landing is not None:
+                    # The step also ran on to a landing, which a stomp from above always comes before:
+                    # Zach is still in the air and the combo it reset still counts
+                    self.zach.on_ground = False
+                    self.zach.consecutive_kills = self.zach.kills_before_landing
+            
             for spider in spiders_to_kill:
                 spider.kill()
+                if not self.swarm:
+                    self.spider_grid.remove(spider)
                 self.spiders_defeated += 1
                 self.total_spiders_defeated += 1
             
@@ -452,9 +832,9 @@ class Game:
             self.best_combo = max(self.best_combo, self.zach.consecutive_kills)
             
             # Update high score and save if needed
-            if self.score > self.high_score:
-                self.high_score = self.score
-                save_high_score(self.high_score)
+            self.update_high_score()
+            if self.event_log:
+                self.event_log.kill(self, spiders_killed_count, avg_x, avg_y)
             
             # Reset combo timer if enabled
             if COMBO_TIMEOUT_FRAMES is not None:
@@ -462,196 +842,589 @@ class Game:
             
             # Add floating text popup only for bonus points
             if bonus_points > 0:
-                self.floating_texts.append({
-                    'text': f'+{bonus_points}',
-                    'x': avg_x,
-                    'y': avg_y,
-                    'vy': -1.0,
-                    'ttl': 30
-                })
+                self.popups.spawn_text(f'+{bonus_points}', avg_x, avg_y, vy=-1.0, ttl=30)
             
-            # Play appropriate kill sound
+            # Play appropriate kill sound (a synthesized chord stands in for announcers still loading
+            # or missing); bigger multikills outrank smaller ones on the announcer channels
+            double_kill_sound = self.sound(DOUBLE_KILL_SOUND)
+            triple_kill_sound = self.sound(TRIPLE_KILL_SOUND)
+            monster_kill_sound = self.sound(MONSTER_KILL_SOUND)
             if spiders_killed_count == 2 and double_kill_sound:
-                double_kill_sound.play()
+                self.play_sound(double_kill_sound, 'announcer', priority=2)
             elif spiders_killed_count == 3 and triple_kill_sound:
-                triple_kill_sound.play()
+                self.play_sound(triple_kill_sound, 'announcer', priority=3)
             elif spiders_killed_count >= 4 and monster_kill_sound:
-                monster_kill_sound.play()
-            else:
-                # Single kill or fallback sound
+                self.play_sound(monster_kill_sound, 'announcer', priority=4)
+            elif spiders_killed_count >= 2 and self.voices:
+                self.play_sound(get_multi_kill_sound(spiders_killed_count), 'announcer',
+                                priority=min(spiders_killed_count, 4))
+            elif self.voices:
+                # Single kill
                 pitch = 1.0 + (self.zach.consecutive_kills - 1) * 0.2
-                generate_kill_sound(pitch).play()
+                self.play_sound(get_kill_sound(pitch), priority=KILL_BEEP_PRIORITY)
             
             # Play bonus sound for big multikill scoring
-            if total_points >= BASE_POINTS * 3:
-                generate_kill_sound(1.5).play()
+            if total_points >= BASE_POINTS * 3 and self.voices:
+                self.play_sound(get_kill_sound(1.5), priority=BONUS_BEEP_PRIORITY)
             
             # Bounce height scales with number of spiders killed
             self.zach.vel_y = (JUMP_SPEED // 2) * spiders_killed_count
+            if first_contact < 1.0:
+                # Rise for the rest of the step, as the following one-frame steps would have
+                self.zach.fall(self.step_frames - contact_frame)
             
-            if self.spiders_defeated >= 10:
+            if self.spiders_defeated >= self.spiders_per_level:
+                if self.event_log:
+                    self.event_log.level_clear(self)
                 # Check if this is the final level (level 10)
-                if self.level >= 10:
+                if self.level >= FINAL_LEVEL:
                     # Player has won the game!
                     self.game_won = True
                     self.game_over = True
                     # Play win sound
-                    if win_sound:
-                        win_sound.play()
-                    # Save high score on game completion
-                    if self.score > self.high_score:
-                        self.high_score = self.score
-                        save_high_score(self.high_score)
+                    self.play_music(WIN_SOUND, [level_sound_name(1)])
+                    # Save high score and scoreboard on game completion
+                    self.update_high_score()
+                    self.record_run()
+                    if self.event_log:
+                        self.event_log.game_end(self)
                 else:
                     # Add a life when completing a level
                     self.zach.add_life()
                     self.next_level()
 
-    def update_scoring(self):
+    def spider_contacts(self):
+        """Return (spider, time of impact) for every live spider Zach touched in the latest step, earliest first.
+        
+        Times are fractions of the step. One-frame steps only look at where
+        things ended up (every contact at time 1.0); longer steps sweep Zach and
+        the spiders from where they started so nothing can be passed through.
+        """
+        if self.step_frames == 1:
+            return [(spider, 1.0) for spider in self.spider_collisions()]
+        
+        start = self.sweep_start()
+        end = self.zach.rect
+        # Search everything a spider could have come from while Zach moved
+        reach = self.step_frames * (SPIDER_MAX_BASE_SPEED + (self.level - 1) * SPIDER_SPEED_PER_LEVEL) + 1
+        area = start.union(end).inflate(2 * int(reach) + 2, 0)
+        if self.swarm:
+            swarm = self.spiders
+            swarm.refresh_grid()
+            candidates = swarm.grid.query(area)
+            end_xs = swarm.x[candidates]
+            # Spiders of a level that only started this step haven't moved from anywhere
+            start_xs = end_xs if swarm.previous_x is None else swarm.previous_x[candidates]
+            ys = swarm.y[candidates]
+            spiders = [SwarmSpider(swarm, i) for i in candidates.tolist()]
+        else:
+            spiders = self.spider_grid.query(area)
+            end_xs = [spider.rect.x for spider in spiders]
+            start_xs = [self.previous_positions.get(spider, spider.rect.topleft)[0] for spider in spiders]
+            ys = [spider.rect.y for spider in spiders]
+        times = sweep_times(start, end.x - start.x, end.y - start.y, start_xs, ys,
+                            np.subtract(end_xs, start_xs), SPIDER_WIDTH, SPIDER_HEIGHT)
+        hits = np.flatnonzero(np.isfinite(times))
+        hits = hits[np.argsort(times[hits], kind='stable')]
+        return [(spiders[i], float(times[i])) for i in hits.tolist()]
+    
+    def sweep_start(self):
+        """Zach's rect as it was at the start of the latest step"""
+        rect = self.zach.rect.copy()
+        previous = self.previous_positions.get(self.zach)
+        if previous is not None:
+            rect.topleft = previous.topleft
+        return rect
+
+    def spider_collisions(self):
+        """Return the live spiders overlapping Zach, looking only at broadphase grid neighbours"""
+        if self.swarm:
+            return self.spiders.collide(self.zach.rect)
+        # Candidate order differs from spritecollide's, but handle_collisions'
+        # outcome only depends on which spiders were hit, not their order
+        zach_rect = self.zach.rect
+        return [spider for spider in self.spider_grid.query(zach_rect) if zach_rect.colliderect(spider.rect)]
+
+    def update_scoring(self, frames=1):
         """Update scoring-related systems like combo timeout and floating text"""
         # Handle combo timeout
         if COMBO_TIMEOUT_FRAMES is not None and self.combo_timer > 0:
-            self.combo_timer -= 1
+            self.combo_timer -= frames
             if self.combo_timer <= 0 and self.zach.consecutive_kills > 0:
                 self.zach.consecutive_kills = 0  # Reset combo on timeout
         
         # Update floating text popups
-        for text in self.floating_texts[:]:  # Use slice to avoid modifying list while iterating
-            text['y'] += text['vy']
-            text['ttl'] -= 1
-            if text['ttl'] <= 0:
-                self.floating_texts.remove(text)
+        for _ in range(frames):
+            self.popups.update()
+
+    def build_background(self):
+        """Render the static backdrop (sky and ground) once so frames can be restored from it"""
+        background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        background.fill(WHITE)
+        pygame.draw.rect(background, BROWN, (0, SCREEN_HEIGHT - 60, SCREEN_WIDTH, 60))
+        return background
+
+    def display_item(self, key, surface, stamp):
+        """Add an item to this frame's display list, reusing key's entry from earlier frames; return its rect to position"""
+        cached = self.display_entries.get(key)
+        if cached is None:
+            rect = pygame.Rect(0, 0, 0, 0)
+            cached = self.display_entries[key] = ([key, surface, rect, stamp], [surface, rect])
+        entry, blit = cached
+        entry[1] = blit[0] = surface
+        entry[3] = stamp
+        self.display_list.append(entry)
+        self.blit_list.append(blit)
+        return entry[2]
 
-    def draw(self):
-        self.screen.fill(WHITE)
+    def add_sprite(self, key, sprite, alpha):
+        """Add a sprite to the display list, interpolated alpha of the way from its pre-step position"""
+        self.interpolate(self.display_item(key, sprite.image, sprite.image), sprite, alpha)
+
+    def add_hud_text(self, key, template, value, color, anchor, position):
+        """Render template.format(value) as a HUD line and add it to the display list with its `anchor` point at position"""
+        cached = self.hud_strings.get(key)
+        if cached is None or cached[0] != value:
+            cached = self.hud_strings[key] = (value, template.format(value))
+        text = cached[1]
+        surface = self.text_cache.render(self.small_font, text, color)
+        rect = self.display_item(key, surface, text)
+        rect.size = surface.get_size()
+        setattr(rect, anchor, position)
+
+    def scene_items(self, alpha=1.0):
+        """Build this frame's display list of (key, surface, rect, stamp) items in draw order.
         
-        pygame.draw.rect(self.screen, BROWN, (0, SCREEN_HEIGHT - 60, SCREEN_WIDTH, 60))
+        alpha is how far the frame falls between the previous step and the latest one (1.0 draws the latest).
+        """
+        items = self.display_list
+        items.clear()
+        self.blit_list.clear()
         
-        # Draw all sprites except Zach (we'll draw him separately for blinking effect)
-        for sprite in self.all_sprites:
-            if sprite != self.zach:
-                self.screen.blit(sprite.image, sprite.rect)
+        # Draw the spiders, then Zach on top (separately, for the blinking effect)
+        if self.swarm:
+            for item in self.spiders.display_items(alpha):
+                items.append(item)
+                self.blit_list.append(item[1:3])
+        else:
+            for spider in self.spider_sprites:
+                if spider.alive():
+                    self.add_sprite(spider, spider, alpha)
         
         # Draw Zach with blinking effect if invincible
         if self.zach_alive:
             if self.zach.is_invincible():
                 # Blink every 5 frames (12 times per second at 60 FPS)
                 if (pygame.time.get_ticks() // 83) % 2 == 0:  # 83ms = roughly 12Hz blink
-                    self.screen.blit(self.zach.image, self.zach.rect)
+                    self.add_sprite('zach', self.zach, alpha)
             else:
-                self.screen.blit(self.zach.image, self.zach.rect)
+                self.add_sprite('zach', self.zach, alpha)
         
         # Left side HUD (existing)
-        score_text = self.small_font.render(f"Spiders defeated: {self.total_spiders_defeated}", True, BLACK)
-        self.screen.blit(score_text, (10, 10))
-        
-        level_text = self.small_font.render(f"Level: {self.level}", True, BLACK)
-        self.screen.blit(level_text, (10, 50))
+        self.add_hud_text('defeated', "Spiders defeated: {}", self.total_spiders_defeated, BLACK, 'topleft', (10, 10))
+        self.add_hud_text('level', "Level: {}", self.level, BLACK, 'topleft', (10, 50))
         
         # Right side HUD (new scoring system)
-        score_display = self.small_font.render(f"Score: {self.score}", True, BLACK)
-        score_rect = score_display.get_rect()
-        score_rect.topright = (SCREEN_WIDTH - 10, 10)
-        self.screen.blit(score_display, score_rect)
-        
-        high_score_display = self.small_font.render(f"High Score: {self.high_score}", True, BLACK)
-        high_score_rect = high_score_display.get_rect()
-        high_score_rect.topright = (SCREEN_WIDTH - 10, 50)
-        self.screen.blit(high_score_display, high_score_rect)
-        
-        best_combo_display = self.small_font.render(f"Best Combo: {self.best_combo}", True, BLACK)
-        best_combo_rect = best_combo_display.get_rect()
-        best_combo_rect.topright = (SCREEN_WIDTH - 10, 90)
-        self.screen.blit(best_combo_display, best_combo_rect)
+        self.add_hud_text('score', "Score: {}", self.score, BLACK, 'topright', (SCREEN_WIDTH - 10, 10))
+        self.add_hud_text('high_score', "High Score: {}", self.high_score, BLACK, 'topright', (SCREEN_WIDTH - 10, 50))
+        self.add_hud_text('best_combo', "Best Combo: {}", self.best_combo, BLACK, 'topright', (SCREEN_WIDTH - 10, 90))
         
         # Show current combo multiplier if active
         if self.zach.consecutive_kills > 0:
             consec_mult = 1.0 + CONSEC_BONUS_PER * max(0, self.zach.consecutive_kills - 1)
-            combo_display = self.small_font.render(f"Combo x{consec_mult:.2f}", True, GREEN)
-            combo_rect = combo_display.get_rect()
-            combo_rect.topright = (SCREEN_WIDTH - 10, 130)
-            self.screen.blit(combo_display, combo_rect)
-        
-        # Draw floating text popups
-        for text in self.floating_texts:
-            fade = text['ttl'] / 30.0
-            alpha = int(255 * fade)
-            color = (min(255, 100 + alpha), min(255, 50 + alpha), 0)
-            text_surface = self.small_font.render(text['text'], True, color)
-            x = text['x'] - text_surface.get_width() // 2
-            self.screen.blit(text_surface, (x, int(text['y'])))
+            self.add_hud_text('combo', "Combo x{:.2f}", consec_mult, GREEN, 'topright', (SCREEN_WIDTH - 10, 130))
         
+        # Draw floating text popups (straight from the pool's slots, without copying the live list)
+        slots = self.popups.slots
+        for i in range(self.popups.count):
+            popup = slots[i]
+            self.display_item(popup, popup.canvas, popup.ttl).update(popup.rect)
+        
+        return items
+
+    def draw_overlay(self):
+        """Draw the level transition or game over text on top of the scene"""
         if self.level_transition:
             # Draw level transition screen
-            level_text = self.font.render(f"Level {self.level}", True, BLUE)
+            level_text = self.text_cache.render(self.font, f"Level {self.level}", BLUE)
             text_rect = level_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
             self.screen.blit(level_text, text_rect)
             
             # Show countdown or progress
-            elapsed = time.time() - self.level_transition_start
-            remaining = max(0, self.level_transition_duration - elapsed)
-            countdown_text = self.small_font.render(f"Starting in {remaining:.1f}s", True, BLACK)
-            countdown_rect = countdown_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 80))
-            self.screen.blit(countdown_text, countdown_rect)
+            remaining = max(0, self.level_transition_frames / FPS)
+            prefix_text = self.text_cache.render(self.small_font, "Starting in ", BLACK)
+            seconds = f"{remaining:.1f}s"
+            countdown_rect = pygame.Rect(0, 0, prefix_text.get_width() + self.countdown_glyphs.width(seconds), prefix_text.get_height())
+            countdown_rect.center = (SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 80)
+            self.screen.blit(prefix_text, countdown_rect)
+            self.countdown_glyphs.draw(self.screen, seconds, (countdown_rect.x + prefix_text.get_width(), countdown_rect.y))
         elif self.game_over:
             if self.game_won:
                 # Show win screen
-                win_text = self.font.render("YOU WIN!", True, GREEN)
+                win_text = self.text_cache.render(self.font, "YOU WIN!", GREEN)
                 text_rect = win_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 50))
                 self.screen.blit(win_text, text_rect)
                 
                 # Show final stats
-                stats_text = self.small_font.render(f"Final Score: {self.score} | Total Spiders: {self.total_spiders_defeated}", True, BLACK)
+                stats_text = self.text_cache.render(self.small_font, f"Final Score: {self.score} | Total Spiders: {self.total_spiders_defeated}", BLACK)
                 stats_rect = stats_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 10))
                 self.screen.blit(stats_text, stats_rect)
                 
-                restart_text = self.small_font.render("Press 'R' to restart", True, BLACK)
+                restart_text = self.text_cache.render(self.small_font, "Press 'R' to restart", BLACK)
                 text_rect = restart_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 50))
                 self.screen.blit(restart_text, text_rect)
             else:
                 # Show game over screen
-                lose_text = self.font.render("GAME OVER", True, RED)
+                lose_text = self.text_cache.render(self.font, "GAME OVER", RED)
                 text_rect = lose_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 50))
                 self.screen.blit(lose_text, text_rect)
                 
-                restart_text = self.small_font.render("Press 'R' to restart", True, BLACK)
+                restart_text = self.text_cache.render(self.small_font, "Press 'R' to restart", BLACK)
                 text_rect = restart_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 50))
                 self.screen.blit(restart_text, text_rect)
+
+    def draw(self, alpha=1.0):
+        profiler = self.profiler
+        items = self.scene_items(alpha)
+        overlay_visible = self.profiler_overlay is not None and self.profiler_overlay.visible
+        
+        # Transitions, end screens and the profiler overlay cover most of the screen, so they always redraw in full
+        if self.renderer and not (self.level_transition or self.game_over or overlay_visible):
+            self.renderer.render(items)
+            if self.recorder:
+                self.recorder.capture()
+            if profiler:
+                profiler.mark('draw')
+            self.renderer.present()
+            if profiler:
+                profiler.mark('flip')
+            return
         
+        self.screen.blit(self.background, (0, 0))
+        self.screen.blits(self.blit_list, doreturn=False)
+        self.draw_overlay()
+        if overlay_visible:
+            self.profiler_overlay.draw(self.screen)
+        if self.recorder:
+            self.recorder.capture()
+        if profiler:
+            profiler.mark('draw')
         pygame.display.flip()
+        if profiler:
+            profiler.mark('flip')
+        if self.renderer:
+            self.renderer.invalidate()
+    
+    def snapshot(self, buffer=None, offset=0):
+        """Save the simulation state into buffer at offset (a new bytearray by default) and return the buffer"""
+        return self.snapshot_format.save(self, buffer, offset)
+    
+    def restore(self, buffer, offset=0):
+        """Return to a state saved by snapshot()"""
+        self.snapshot_format.restore(self, buffer, offset)
+    
+    def open_window(self, vsync):
+        if vsync:
+            # SDL only syncs scaled or OpenGL windows; fall back to a plain window if that fails
+            try:
+                return pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SCALED, vsync=1)
+            except pygame.error:
+                print("Vsync is not available, running without it")
+        return pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    
+    def capture_positions(self):
+        """Remember where everything is so the frames drawn after the next step can interpolate from here"""
+        positions = self.previous_positions
+        if positions is None or self.zach not in positions:
+            # First capture since a new level, restart or restore: start over with fresh rects
+            self.previous_positions = {sprite: sprite.rect.copy() for sprite in self.all_sprites}
+        else:
+            for sprite, rect in positions.items():
+                rect.update(sprite.rect)
+        if self.swarm:
+            self.spiders.capture_positions()
+    
+    def interpolate(self, rect, sprite, alpha):
+        """Set rect to the sprite's rect moved back towards its pre-step position by 1 - alpha"""
+        rect.update(sprite.rect)
+        if alpha < 1.0 and self.previous_positions:
+            previous = self.previous_positions.get(sprite)
+            # New sprites (next level, restart) and teleports are drawn where they are
+            if previous is not None:
+                dx = rect.x - previous[0]
+                dy = rect.y - previous[1]
+                if abs(dx) <= INTERPOLATION_SNAP and abs(dy) <= INTERPOLATION_SNAP:
+                    rect.topleft = (previous[0] + int(dx * alpha), previous[1] + int(dy * alpha))
+    
+    def toggle_profiler_overlay(self):
+        if self.profiler_overlay is None:
+            stats = [self] + [source for source in (self.gc_control, self.allocation_meter, self.voices, self.spectators)
+                              if source]
+            self.profiler_overlay = ProfilerOverlay(self.profiler, pygame.font.SysFont('monospace', 16), stats=stats)
+        self.profiler_overlay.toggle()
+    
+    def stats_lines(self):
+        return [f"sim steps skipped {self.skipped_steps}"]
+    
+    def export_profile(self, path=None):
+        """Write the profiler's recent frame timings and spikes to path (a timestamped JSON file by default)"""
+        if path is None:
+            path = time.strftime('frame-profile-%Y%m%d-%H%M%S.json')
+        self.profiler.export(path)
+        print(f"Frame profile written to {path}")
+
+    def step(self, controls=NO_INPUT, frames=1):
+        """Advance the game logic by one frame using the given input.
+        
+        frames > 1 fast-forwards that many frames in one step, holding the input
+        and sweeping collisions across the whole step. Input logs only record
+        one-frame steps faithfully.
+        """
+        if self.input_log is not None:
+            self.input_log.append(controls)
+        profiler = self.profiler
+        self.step_frames = frames
+        if self.music:
+            self.music.update()
+        if self.voices:
+            self.voices.tick(frames)
+        if self.settle_pending:
+            # The previous step ended the level or the game, so this one only shows the "Level N" or
+            # game over screen: collect now rather than in a frame that simulates anything
+            self.settle_pending = False
+            self.gc_control.settle()
+        
+        if self.game_over:
+            if controls.restart:
+                self.reset_game()
+            return
+        self.frame += frames
+        
+        if frames > 1:
+            self.capture_positions()
+        
+        # Check for level transition completion
+        self.check_level_transition(frames)
+        if profiler:
+            profiler.mark('level_transition')
+        
+        # Only update game if not in level transition
+        if not self.level_transition:
+            # Update spiders separately from Zach to avoid interference
+            if self.swarm:
+                self.spiders.update(frames)
+            else:
+                for sprite in self.all_sprites:
+                    if sprite != self.zach:
+                        sprite.update(frames)
+                for spider in self.spiders:
+                    self.spider_grid.move(spider, spider.rect.x, spider.rect.y)
+            # Update Zach separately
+            self.zach.update(controls, frames)
+            if profiler:
+                profiler.mark('sprites')
+            # Update scoring systems
+            self.update_scoring(frames)
+            if profiler:
+                profiler.mark('scoring')
+            self.handle_collisions()
+            if profiler:
+                profiler.mark('collisions')
+            if self.gc_control:
+                self.gc_control.tick()
+                self.settle_pending = self.level_transition or self.game_over
+
+    def poll_events(self):
+        """Handle window and hotkey events; return (running, restart pressed)"""
+        running = True
+        restart = False
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYUP:
+                self.keyboard.handle(event)
+            elif event.type == pygame.KEYDOWN:
+                self.keyboard.handle(event)
+                if event.key == pygame.K_r:
+                    restart = True
+                elif event.key == pygame.K_F3 and self.profiler:
+                    self.toggle_profiler_overlay()
+                elif event.key == pygame.K_F4 and self.profiler:
+                    self.export_profile()
+        return running, restart
 
     def run(self):
         running = True
+        profiler = self.profiler
+        
+        meter = self.allocation_meter
         
         while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_r and self.game_over:
-                        self.reset_game()
+            if profiler:
+                profiler.begin_frame()
+            if meter:
+                meter.begin_frame()
+            running, restart = self.poll_events()
             
-            if not self.game_over:
-                # Check for level transition completion
-                self.check_level_transition()
-                
-                # Only update game if not in level transition
-                if not self.level_transition:
-                    # Update spiders separately from Zach to avoid interference
-                    for sprite in self.all_sprites:
-                        if sprite != self.zach:
-                            sprite.update()
-                    # Update Zach separately
-                    self.zach.update()
-                    # Update scoring systems
-                    self.update_scoring()
-                    self.handle_collisions()
+            controls = self.keyboard.controls
+            controls.restart = restart
+            if profiler:
+                profiler.mark('events')
+            self.step(controls)
+            if self.spectators:
+                self.spectators.publish(self)
             
             self.draw()
+            if meter:
+                meter.end_frame()
             self.clock.tick(FPS)
+            if profiler:
+                profiler.mark('idle')
+                profiler.end_frame()
+        
+        self.shutdown()
+
+    def run_fixed_step(self, render_fps=0):
+        """Run with the simulation at a fixed FPS steps per second, decoupled from the frame rate.
+        
+        Real time is banked in an accumulator and spent in STEP_SECONDS steps, at most
+        MAX_CATCH_UP_STEPS per frame; when the game falls further behind than that the
+        backlog is dropped, so slow frames skip simulation time instead of slowing it down.
+        Frames are drawn as often as render_fps allows (0 = uncapped, or paced by vsync)
+        with sprites interpolated between the last two steps.
+        """
+        running = True
+        profiler = self.profiler
+        accumulator = 0.0
+        restart = False
+        previous_time = time.perf_counter()
+        meter = self.allocation_meter
         
+        while running:
+            if profiler:
+                profiler.begin_frame()
+            if meter:
+                meter.begin_frame()
+            now = time.perf_counter()
+            accumulator += min(now - previous_time, MAX_FRAME_SECONDS)
+            previous_time = now
+            running, pressed = self.poll_events()
+            # A restart press waits for the next step, even if this frame runs none
+            restart = restart or pressed
+            
+            controls = self.keyboard.controls
+            if profiler:
+                profiler.mark('events')
+            steps = 0
+            while accumulator >= STEP_SECONDS and steps < MAX_CATCH_UP_STEPS:
+                controls.restart = restart
+                restart = False
+                self.capture_positions()
+                self.step(controls)
+                accumulator -= STEP_SECONDS
+                steps += 1
+            if accumulator >= STEP_SECONDS:
+                # Too far behind to catch up: skip the backlog rather than spiral
+                skipped = int(accumulator / STEP_SECONDS)
+                self.skipped_steps += skipped
+                accumulator -= skipped * STEP_SECONDS
+            if steps and self.spectators:
+                self.spectators.publish(self)
+            
+            self.draw(accumulator / STEP_SECONDS)
+            if meter:
+                meter.end_frame()
+            self.clock.tick(render_fps)
+            if profiler:
+                profiler.mark('idle')
+                profiler.end_frame()
+        
+        self.shutdown()
+
+    def shutdown(self):
+        if self.skipped_steps:
+            print(f"{self.skipped_steps} simulation steps skipped to keep up with real time")
+        if self.recorder:
+            self.recorder.close()
+            print(self.recorder.summary())
+        if self.spectators:
+            self.spectators.close()
+            print(self.spectators.summary())
+        if self.event_log:
+            if not self.game_over:
+                self.event_log.quit(self)
+            self.event_log.close()
+            print(self.event_log.summary())
+        if self.assets:
+            self.assets.shutdown()
+        if self.music:
+            self.music.shutdown()
+        if self.voices:
+            self.voices.stop()
+        if self.scores:
+            self.scores.close()
+        if self.allocation_meter:
+            self.allocation_meter.close()
+        if self.gc_control:
+            self.gc_control.close()
         pygame.quit()
 
 if __name__ == "__main__":
-    game = Game()
-    game.run()
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Zach's Spider Adventure")
+    parser.add_argument('--dirty-rects', action='store_true', help='repaint only the screen regions that changed each frame '
+                        '(crowded frames, such as big swarms, are still redrawn in full)')
+    parser.add_argument('--swarm', action='store_true', help='store spiders in a SpiderSwarm instead of sprites')
+    parser.add_argument('--spiders', type=int, default=SPIDERS_PER_LEVEL, help='spiders per level')
+    parser.add_argument('--seed', type=int, default=None, help='seed for spider placement and speeds')
+    parser.add_argument('--record', metavar='PATH', help='save a replay of this session to PATH on quit')
+    parser.add_argument('--profile-out', metavar='PATH', help='export frame timings to PATH (.json or .csv) on quit')
+    parser.add_argument('--fixed-step', action='store_true', help='simulate at a fixed 60 Hz and draw frames independently')
+    parser.add_argument('--render-fps', type=int, default=0, help='frame rate cap for --fixed-step (0 = uncapped)')
+    parser.add_argument('--vsync', action='store_true', help='sync frames to the display refresh rate')
+    parser.add_argument('--low-jitter', action='store_true',
+                        help='hold garbage collection back until level transitions and game over')
+    parser.add_argument('--trace-allocations', action='store_true',
+                        help='count allocations per frame with tracemalloc (F3 overlay; slows the game down)')
+    parser.add_argument('--capture', metavar='TARGET',
+                        help='record drawn frames to TARGET: a file (raw), a directory (png) or a shell command (pipe)')
+    parser.add_argument('--capture-format', choices=['raw', 'png', 'pipe'], default='raw',
+                        help='how --capture writes frames; pipe commands may use {width}, {height} and {fps}')
+    parser.add_argument('--capture-buffers', type=int, default=8, help='frames --capture can queue before dropping')
+    parser.add_argument('--spectate', metavar='ADDRESS',
+                        help='stream game state to spectators on host:port or a Unix socket path (see spectate.py)')
+    parser.add_argument('--event-log', metavar='PATH',
+                        help='append kills, lost lives, level times and final scores to PATH (see eventlog.py)')
+    args = parser.parse_args()
+    if args.record and args.seed is not None:
+        from replay import MAX_SEED
+        if not 0 <= args.seed <= MAX_SEED:
+            parser.error(f"--record needs a --seed between 0 and {MAX_SEED}")
+    
+    game = Game(swarm=args.swarm, spiders_per_level=args.spiders, dirty_rects=args.dirty_rects, seed=args.seed,
+                vsync=args.vsync, low_jitter=args.low_jitter)
+    if args.trace_allocations:
+        from jitter import AllocationMeter
+        game.allocation_meter = AllocationMeter()
+    if args.record:
+        from replay import InputLog
+        game.input_log = InputLog(game.seed, game.spiders_per_level, game.swarm)
+    if args.capture:
+        from capture import FrameRecorder
+        game.recorder = FrameRecorder(args.capture, game.screen, args.capture_format,
+                                      slots=args.capture_buffers, fps=FPS)
+    if args.spectate:
+        from spectate import SpectatorServer
+        game.spectators = SpectatorServer(args.spectate, rate=FPS)
+    if args.event_log:
+        from eventlog import EventLog
+        game.event_log = EventLog(args.event_log)
+    if args.fixed_step:
+        game.run_fixed_step(args.render_fps)
+    else:
+        game.run()
+    if args.record:
+        game.input_log.save(args.record, game)
+    if args.profile_out:
+        game.export_profile(args.profile_out)
\ No newline at end of file
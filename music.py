@@ -0,0 +1,106 @@
+# Streamed music: level tracks play through pygame.mixer.music from prefetched compressed bytes, never fully decoded
+
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+
+class MusicPlayer:
+    """Plays one track at a time through the mixer's music stream, with a sequential fade between tracks.
+
+    pygame.mixer.Sound decodes a whole file into RAM; the music stream
+    decodes as it plays instead. prefetch() reads a track's compressed bytes
+    on a background thread; memory holds only the playing track and the
+    prefetched ones, still compressed. play() never waits on the disk: a
+    track that is still being read starts once it has been.
+
+    There is a single music stream, so this is not a crossfade: the tracks
+    never overlap. A track change fades the current one out over
+    `fade_out_ms` and only then fades the next one in over `fade_in_ms`.
+    update() carries out track changes and has to be called every frame.
+    """
+    def __init__(self, sound_dir, fade_out_ms=400, fade_in_ms=100):
+        self.sound_dir = sound_dir
+        self.fade_out_ms = fade_out_ms
+        self.fade_in_ms = fade_in_ms
+        self.reads = {}  # name -> Future resolving to the file's bytes (or None if it can't be read)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='music')
+        self.current = None
+        self.requested = None  # (name, Future of its bytes) of a track play() asked for that is still being read
+        self.stream = None   # The playing track's bytes, read by the mixer as it plays
+        self.waiting = None  # (name, data, time the fade-out ends) of the track to start next
+        self.plays = 0
+
+    def prefetch(self, names):
+        """Queue tracks to be read into memory ahead of play()"""
+        for name in names:
+            if name not in self.reads:
+                self.reads[name] = self.executor.submit(self._read, name)
+
+    def play(self, name):
+        """Switch to the track called name, fading out whatever is playing first"""
+        self.prefetch([name])
+        self.requested = (name, self.reads.pop(name))  # Prefetched again if it is ever replayed
+        self.update()
+
+    def update(self):
+        """Start the requested track once it has been read, and the waiting one once the previous has faded out"""
+        if self.requested is not None and self.requested[1].done():
+            name, read = self.requested
+            self.requested = None
+            self._switch(name, read.result())
+        if self.waiting is None:
+            return
+        name, data, fade_end = self.waiting
+        if pygame.mixer.music.get_busy():
+            if time.perf_counter() < fade_end:
+                return
+            # SDL would block until a fading track finishes before starting another, so cut the
+            # (by now silent) tail off instead
+            pygame.mixer.music.stop()
+        self.waiting = None
+        self._start(name, data)
+
+    def _switch(self, name, data):
+        if data is None:
+            return
+        if pygame.mixer.music.get_busy() and self.waiting is None:
+            pygame.mixer.music.fadeout(self.fade_out_ms)
+            self.waiting = (name, data, time.perf_counter() + self.fade_out_ms / 1000)
+        elif self.waiting is not None:
+            # Still fading the old track out: the new one simply replaces the one waiting
+            self.waiting = (name, data, self.waiting[2])
+        else:
+            self._start(name, data)
+
+    def stop(self):
+        self.requested = None
+        self.waiting = None
+        pygame.mixer.music.stop()
+
+    def shutdown(self):
+        self.stop()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _start(self, name, data):
+        try:
+            stream = io.BytesIO(data)
+            pygame.mixer.music.load(stream, os.path.splitext(name)[1].lstrip('.'))
+            pygame.mixer.music.play(fade_ms=self.fade_in_ms)
+        except pygame.error:
+            print(f"Could not play music file: {name}")
+            return
+        self.current = name
+        self.stream = stream
+        self.plays += 1
+
+    def _read(self, name):
+        try:
+            with open(os.path.join(self.sound_dir, name), 'rb') as f:
+                return f.read()
+        except OSError:
+            print(f"Could not load music file: {name}")
+            return None
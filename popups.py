@@ -0,0 +1,92 @@
+# Fixed-capacity pool for floating score popups
+
+import pygame
+
+from textcache import GlyphAtlas
+
+
+class Popup:
+    """One pool slot; slots are allocated up front and reused, never freed"""
+    __slots__ = ('x', 'y', 'vy', 'ttl', 'max_ttl', 'canvas', 'rect')
+
+    def __init__(self):
+        self.x = 0.0
+        self.y = 0.0
+        self.vy = 0.0
+        self.ttl = 0
+        self.max_ttl = 1
+        self.canvas = None  # Pool-owned surface the popup's text is composed into, and what gets drawn
+        self.rect = pygame.Rect(0, 0, 0, 0)
+
+
+class PopupPool:
+    """Pool of rising, fading text popups kept as slots[:count] with swap-remove on expiry.
+
+    Popups are composed from pre-rendered glyphs into a per-slot canvas
+    once, when spawned, and fade out through per-surface alpha, so updating
+    and drawing a popup never rasterizes text or allocates.
+    """
+    def __init__(self, font, color, capacity=64, chars="+-0123456789"):
+        self.slots = [Popup() for _ in range(capacity)]
+        self.count = 0
+        self.color = color
+        self.glyphs = GlyphAtlas(font, chars, color)
+        self.height = font.get_height()
+        self.recycled = 0  # Spawns that had to take over a live slot because the pool was full
+
+    def clear(self):
+        self.count = 0
+
+    def _claim_slot(self):
+        if self.count < len(self.slots):
+            slot = self.slots[self.count]
+            self.count += 1
+            return slot
+        # Pool is full: take over the popup closest to expiring
+        self.recycled += 1
+        return min(self.slots, key=lambda slot: slot.ttl)
+
+    def spawn_text(self, text, x, y, vy=-1.0, ttl=30):
+        """Start a rising text popup; text may only use the pool's glyph characters"""
+        slot = self._claim_slot()
+        # Reuse the slot's canvas when the new text is the same size
+        size = (self.glyphs.width(text), self.height)
+        canvas = slot.canvas
+        if canvas is None or canvas.get_size() != size:
+            canvas = slot.canvas = pygame.Surface(size, pygame.SRCALPHA)
+        # Transparent pixels share the text color so antialiased edges blend cleanly
+        canvas.fill((*self.color, 0))
+        self.glyphs.draw(canvas, text, (0, 0))
+        canvas.set_alpha(255)
+        slot.x = x
+        slot.y = y
+        slot.vy = vy
+        slot.ttl = ttl
+        slot.max_ttl = ttl
+        slot.rect.size = size
+        self._place(slot)
+        return slot
+
+    def _place(self, slot):
+        slot.rect.x = int(slot.x) - slot.rect.width // 2
+        slot.rect.y = int(slot.y)
+
+    def update(self):
+        """Advance every live popup one frame, fading it and swap-removing the expired ones"""
+        slots = self.slots
+        i = 0
+        while i < self.count:
+            slot = slots[i]
+            slot.ttl -= 1
+            if slot.ttl <= 0:
+                # Swap the last live slot into this one; the expired slot keeps its canvas for reuse
+                self.count -= 1
+                slots[i], slots[self.count] = slots[self.count], slot
+                continue
+            slot.y += slot.vy
+            self._place(slot)
+            slot.canvas.set_alpha(255 * slot.ttl // slot.max_ttl)
+            i += 1
+
+    def __len__(self):
+        return self.count
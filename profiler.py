@@ -0,0 +1,167 @@
+# Per-phase frame profiler: ring buffer of phase timings, spike log, overlay and JSON/CSV export
+
+import csv
+import json
+import time
+from collections import deque
+
+import numpy as np
+import pygame
+
+
+class FrameProfiler:
+    """Times the phases of each frame into a fixed-size ring buffer.
+
+    Call begin_frame() at the top of the loop, mark(phase) after each phase
+    (the time since the previous mark is charged to that phase, so marking a
+    phase twice in a frame adds up) and end_frame() at the bottom. Frames whose
+    work (everything but `idle_phase`) overruns the frame budget are kept as
+    spike events with their phase breakdown.
+    """
+    def __init__(self, phases, capacity=1200, budget_ms=1000 / 60, idle_phase='idle', max_spikes=500):
+        self.phases = list(phases)
+        self.phase_index = {phase: i for i, phase in enumerate(self.phases)}
+        self.idle_index = self.phase_index.get(idle_phase)
+        self.samples = np.zeros((capacity, len(self.phases)))  # milliseconds per phase
+        self.budget_ms = budget_ms
+        self.frames = 0  # Frames recorded since start
+        self.spikes = deque(maxlen=max_spikes)
+        self.current = [0.0] * len(self.phases)
+        self.last = time.perf_counter()
+
+    def begin_frame(self):
+        self.current = [0.0] * len(self.phases)
+        self.last = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.current[self.phase_index[phase]] += (now - self.last) * 1000
+        self.last = now
+
+    def end_frame(self):
+        row = self.current
+        self.samples[self.frames % len(self.samples)] = row
+        work = sum(row) - (row[self.idle_index] if self.idle_index is not None else 0)
+        if work > self.budget_ms:
+            self.spikes.append({
+                'frame': self.frames,
+                'time': time.time(),
+                'work_ms': round(work, 3),
+                'phases_ms': {phase: round(ms, 3) for phase, ms in zip(self.phases, row)},
+            })
+        self.frames += 1
+
+    def recent(self):
+        """Recorded frames still in the ring buffer, oldest first"""
+        capacity = len(self.samples)
+        if self.frames <= capacity:
+            return self.samples[:self.frames]
+        start = self.frames % capacity
+        return np.concatenate((self.samples[start:], self.samples[:start]))
+
+    def work_times(self, frames=None):
+        """Per-frame work time in milliseconds for the recent frames"""
+        frames = self.recent() if frames is None else frames
+        work = frames.sum(axis=1)
+        if self.idle_index is not None:
+            work -= frames[:, self.idle_index]
+        return work
+
+    def summary(self):
+        """p50, p99, mean and max per phase (plus total work) over the ring buffer"""
+        frames = self.recent()
+        if not len(frames):
+            return {}
+        columns = list(zip(self.phases, frames.T)) + [('work', self.work_times(frames))]
+        return {
+            name: {
+                'p50': round(float(np.percentile(values, 50)), 3),
+                'p99': round(float(np.percentile(values, 99)), 3),
+                'mean': round(float(values.mean()), 3),
+                'max': round(float(values.max()), 3),
+            }
+            for name, values in columns
+        }
+
+    def export(self, path):
+        """Write the buffered timings and spike events to path (.csv for CSV, JSON otherwise)"""
+        frames = self.recent()
+        first = self.frames - len(frames)
+        if path.endswith('.csv'):
+            spike_frames = {spike['frame'] for spike in self.spikes}
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['frame'] + self.phases + ['work', 'spike'])
+                for offset, (row, work) in enumerate(zip(frames.tolist(), self.work_times(frames).tolist())):
+                    frame = first + offset
+                    writer.writerow([frame] + [round(ms, 4) for ms in row] + [round(work, 4), int(frame in spike_frames)])
+            return
+        report = {
+            'exported_at': time.time(),
+            'budget_ms': self.budget_ms,
+            'phases': self.phases,
+            'first_frame': first,
+            'frames_ms': np.round(frames, 4).tolist(),
+            'summary': self.summary(),
+            'spikes': list(self.spikes),
+        }
+        with open(path, 'w') as f:
+            json.dump(report, f)
+
+
+class ProfilerOverlay:
+    """Frame-time graph and per-phase p50/p99 table drawn over the game.
+
+    `stats` are extra sources (GcController, AllocationMeter) whose
+    stats_lines() are listed under the table.
+    """
+    def __init__(self, profiler, font, graph_frames=240, refresh_frames=30, stats=()):
+        self.profiler = profiler
+        self.stats = list(stats)
+        self.font = font
+        self.graph_frames = graph_frames
+        self.refresh_frames = refresh_frames  # The table is re-rendered this often, not every frame
+        self.visible = False
+        self.lines = []
+        self.lines_frame = -refresh_frames
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def draw(self, surface, topleft=(10, 170)):
+        profiler = self.profiler
+        if profiler.frames - self.lines_frame >= self.refresh_frames:
+            self.lines = self._render_table()
+            self.lines_frame = profiler.frames
+
+        width = self.graph_frames + 20
+        height = 90 + sum(line.get_height() for line in self.lines)
+        panel = pygame.Rect(topleft, (max(width, max((line.get_width() + 20 for line in self.lines), default=0)), height))
+        surface.fill((20, 20, 20), panel)
+
+        # Work time per frame, scaled so twice the frame budget fills the graph
+        graph_bottom = panel.top + 70
+        scale = 60 / (2 * profiler.budget_ms)
+        work = profiler.work_times()[-self.graph_frames:]
+        for x, ms in enumerate(work.tolist()):
+            color = (255, 80, 80) if ms > profiler.budget_ms else (80, 220, 80)
+            bar_top = graph_bottom - min(60, int(ms * scale))
+            pygame.draw.line(surface, color, (panel.left + 10 + x, graph_bottom), (panel.left + 10 + x, bar_top))
+        budget_y = graph_bottom - int(profiler.budget_ms * scale)
+        pygame.draw.line(surface, (255, 255, 0), (panel.left + 10, budget_y), (panel.left + 10 + self.graph_frames, budget_y))
+
+        y = graph_bottom + 10
+        for line in self.lines:
+            surface.blit(line, (panel.left + 10, y))
+            y += line.get_height()
+        return panel
+
+    def _render_table(self):
+        summary = self.profiler.summary()
+        rows = [f"{'phase':<17}{'p50':>7}{'p99':>8} ms"]
+        for name, stats in summary.items():
+            rows.append(f"{name:<17}{stats['p50']:>7.2f}{stats['p99']:>8.2f}")
+        rows.append(f"spikes: {len(self.profiler.spikes)}")
+        for source in self.stats:
+            rows.extend(source.stats_lines())
+        return [self.font.render(row, True, (230, 230, 230)) for row in rows]
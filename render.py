@@ -0,0 +1,123 @@
+# Dirty-rectangle renderer: repaints and presents only the parts of the screen that changed
+
+import pygame
+
+
+class DirtyRectRenderer:
+    """Redraws a frame's display list over a cached background, touching only changed regions.
+
+    A display list is a sequence of (key, surface, rect, stamp) items in draw
+    order. `key` identifies the item across frames and `stamp` is any value
+    that changes when the item's pixels change (the surface itself for
+    sprites, the text for HUD lines). An item is dirty when it appears,
+    disappears, moves or changes stamp; the regions it covered last frame and
+    covers now are restored from the background and every item overlapping
+    them is redrawn in order. Item rects are copied, never kept, so callers
+    may reuse them from frame to frame.
+
+    Display lists longer than `max_items` are redrawn in full without being
+    diffed: past that point the per-item bookkeeping costs more than the fill
+    it saves, even when little has changed.
+    """
+    def __init__(self, screen, background, max_rects=64, max_area_fraction=0.5, max_items=128):
+        self.screen = screen
+        self.background = background
+        self.max_rects = max_rects
+        self.max_items = max_items
+        self.max_area = screen.get_width() * screen.get_height() * max_area_fraction
+        self.previous = {}  # key -> [rect, stamp] as presented last frame
+        self.current = {}   # The same for the frame being rendered; the two swap every frame
+        self.dirty = []
+        self.full_redraw_pending = True
+        self.pending = []  # Regions drawn but not yet presented; None means the whole screen
+        self.full_redraws = 0
+        self.partial_redraws = 0
+
+    def invalidate(self):
+        """Forget what is on screen so the next frame is redrawn in full"""
+        self.full_redraw_pending = True
+
+    def render(self, items):
+        """Draw the display list into the changed regions; present() then pushes them to the display"""
+        if len(items) > self.max_items:
+            self.draw_full(items)
+            # Nothing was diffed, so the next frame can't be either
+            self.previous.clear()
+            self.full_redraw_pending = True
+            return
+        previous = self.previous
+        current = self.current
+        dirty = self.dirty
+        dirty.clear()
+        for key, surface, rect, stamp in items:
+            # Entries move from last frame's dict to this frame's, so only items that are new or changed allocate
+            shown = previous.pop(key, None)
+            if shown is None:
+                shown = [pygame.Rect(rect), stamp]
+                dirty.append(rect)
+            elif shown[0] != rect or shown[1] != stamp:
+                dirty.append(pygame.Rect(shown[0]))
+                dirty.append(rect)
+                shown[0].update(rect)
+                shown[1] = stamp
+            current[key] = shown
+        # Whatever is left was on screen last frame and is gone now
+        for rect, _ in previous.values():
+            dirty.append(rect)
+        previous.clear()
+        self.previous, self.current = current, previous
+
+        if self.full_redraw_pending:
+            self.draw_full(items)
+            return
+        if not dirty:
+            self.pending = []
+            return
+
+        regions = merge_rects(dirty, self.max_rects)
+        if regions is None or sum(r.width * r.height for r in regions) > self.max_area:
+            # Too much changed for region bookkeeping to beat a plain redraw
+            self.draw_full(items)
+            return
+
+        screen = self.screen
+        item_rects = [item[2] for item in items]
+        for region in regions:
+            screen.set_clip(region)
+            screen.blit(self.background, region, region)
+            screen.blits([(items[i][1], items[i][2]) for i in region.collidelistall(item_rects)], doreturn=False)
+        screen.set_clip(None)
+        self.pending = regions
+        self.partial_redraws += 1
+
+    def draw_full(self, items):
+        self.screen.blit(self.background, (0, 0))
+        self.screen.blits([(surface, rect) for _, surface, rect, _ in items], doreturn=False)
+        self.pending = None
+        self.full_redraw_pending = False
+        self.full_redraws += 1
+
+    def present(self):
+        """Push what the last render() drew to the display"""
+        if self.pending is None:
+            pygame.display.flip()
+        elif self.pending:
+            pygame.display.update(self.pending)
+
+
+def merge_rects(rects, max_rects):
+    """Union overlapping rects together; None if more than max_rects remain"""
+    merged = []
+    for rect in rects:
+        if not rect.width or not rect.height:
+            continue
+        rect = pygame.Rect(rect)
+        # Keep absorbing merged rects until this one no longer touches any of them
+        hit = rect.collidelist(merged)
+        while hit != -1:
+            rect.union_ip(merged.pop(hit))
+            hit = rect.collidelist(merged)
+        merged.append(rect)
+        if len(merged) > max_rects:
+            return None
+    return merged
@@ -0,0 +1,119 @@
+# Deterministic record/replay: a run is its RNG seed plus a bit-packed log of per-frame inputs
+#
+#   python main.py --record run.zrp        record a game
+#   python replay.py run.zrp [...]         re-run replays headless and check their results
+
+import os
+import struct
+
+import numpy as np
+
+from controls import FrameInput
+
+MAGIC = b'ZRPL'
+# 2: spawn positions come from spawn.place_spaced, so version 1 seeds lay levels out differently
+# 3: the header records whether the game was a swarm game
+# 4: spawn offsets are drawn as a uniform subset, so version 3 seeds lay levels out differently
+VERSION = 4
+# magic, version, seed, spiders per level, flags, frames, score, total spiders defeated, best combo, level
+HEADER = struct.Struct('<4sHQIBIQIIH')
+SWARM = 1  # Header flag: spiders were kept in a SpiderSwarm
+MAX_SEED = (1 << 64) - 1  # Seeds are stored unsigned in 64 bits
+
+
+class InputLog:
+    """Growing log of a game's inputs: one 4-bit code per frame, two frames per byte on disk"""
+    def __init__(self, seed, spiders_per_level, swarm=False, codes=None):
+        if not 0 <= seed <= MAX_SEED:
+            raise ValueError(f"Replay seeds must be between 0 and {MAX_SEED}, not {seed}")
+        self.seed = seed
+        self.spiders_per_level = spiders_per_level
+        self.swarm = swarm
+        self.codes = bytearray() if codes is None else bytearray(codes)
+        self.expected = None  # (score, total_spiders_defeated, best_combo, level) stored with the log
+
+    def append(self, controls):
+        self.codes.append(controls.to_bits())
+
+    def __len__(self):
+        return len(self.codes)
+
+    def save(self, path, game):
+        """Write the log with the game's final results, for replays to be checked against"""
+        codes = np.frombuffer(bytes(self.codes), dtype=np.uint8)
+        if len(codes) % 2:
+            codes = np.append(codes, np.uint8(0))
+        packed = codes[0::2] | (codes[1::2] << 4)
+        header = HEADER.pack(MAGIC, VERSION, self.seed, self.spiders_per_level, SWARM if self.swarm else 0, len(self.codes),
+                             game.score, game.total_spiders_defeated, game.best_combo, game.level)
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(header)
+            f.write(packed.tobytes())
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, seed, spiders_per_level, flags, frames, score, defeated, best_combo, level = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} replay")
+        packed = np.frombuffer(data, dtype=np.uint8, offset=HEADER.size)
+        codes = np.empty(len(packed) * 2, dtype=np.uint8)
+        codes[0::2] = packed & 0x0F
+        codes[1::2] = packed >> 4
+        log = cls(seed, spiders_per_level, bool(flags & SWARM), codes[:frames].tobytes())
+        log.expected = (score, defeated, best_combo, level)
+        return log
+
+
+def play(log, game):
+    """Feed every logged input to a fresh game built with the log's seed and spider store; returns the game"""
+    if game.swarm != log.swarm:
+        raise ValueError(f"Replay was recorded {'with' if log.swarm else 'without'} a spider swarm and can't be "
+                         f"played back {'with' if game.swarm else 'without'} one")
+    # The 16 possible inputs are decoded once and shared between frames
+    inputs = [FrameInput.from_bits(bits) for bits in range(16)]
+    step = game.step
+    for bits in log.codes:
+        step(inputs[bits])
+    return game
+
+
+def results(game):
+    return (game.score, game.total_spiders_defeated, game.best_combo, game.level)
+
+
+def main_cli():
+    import argparse
+    import time
+
+    # Replays run headless; the drivers must be chosen before the game module initializes pygame
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+    from main import Game
+
+    parser = argparse.ArgumentParser(description='Re-run recorded games headless and check their results')
+    parser.add_argument('replays', nargs='+', help='replay files written with main.py --record')
+    args = parser.parse_args()
+
+    failures = 0
+    for path in args.replays:
+        log = InputLog.load(path)
+        game = Game(headless=True, seed=log.seed, spiders_per_level=log.spiders_per_level, swarm=log.swarm)
+        start = time.perf_counter()
+        play(log, game)
+        elapsed = time.perf_counter() - start
+        ok = results(game) == log.expected
+        failures += not ok
+        speed = len(log) / elapsed if elapsed else float('inf')
+        print(f"{'ok  ' if ok else 'FAIL'} {path}: {len(log)} frames in {elapsed:.3f}s ({speed:,.0f} frames/s, "
+              f"{speed / 60:,.0f}x real time) score={game.score} defeated={game.total_spiders_defeated} "
+              f"best_combo={game.best_combo}" + ('' if ok else f" expected {log.expected}"))
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main_cli()
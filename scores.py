@@ -0,0 +1,110 @@
+# High score and scoreboard persistence, written from a background thread with atomic replaces
+
+import json
+import os
+import threading
+import time
+
+
+def read_high_score(path):
+    """Load high score from file, return 0 if file doesn't exist"""
+    try:
+        with open(path, 'r') as f:
+            return int(f.read().strip())
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def write_atomic(path, text):
+    """Replace path with text so that readers (and crashes) only ever see the old or the new file"""
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class ScoreStore:
+    """In-memory high score and top-N scoreboard, persisted by a debounced background writer.
+
+    The game thread only updates memory. The writer thread saves at most once
+    every `flush_interval` seconds while something changed, and straight away
+    when flush() is called (game over, quit).
+    """
+    def __init__(self, high_score_path, scoreboard_path, top_n=10, flush_interval=5.0):
+        self.high_score_path = high_score_path
+        self.scoreboard_path = scoreboard_path
+        self.top_n = top_n
+        self.flush_interval = flush_interval
+        self.high_score = read_high_score(high_score_path)
+        self.scoreboard = self._read_scoreboard()
+        self.writes = 0
+
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.flush_now = threading.Event()
+        self.closing = False
+        self.writer = threading.Thread(target=self._writer_loop, name='score-writer', daemon=True)
+        self.writer.start()
+
+    def _read_scoreboard(self):
+        # Only the top N runs are ever stored, so this stays a small fixed-size read
+        try:
+            with open(self.scoreboard_path, 'r') as f:
+                entries = json.load(f)
+            return sorted(entries, key=lambda entry: entry['score'], reverse=True)[:self.top_n]
+        except (OSError, ValueError, KeyError, TypeError):
+            return []
+
+    def submit_high_score(self, score):
+        """Raise the stored high score; saved by the next debounced write"""
+        with self.lock:
+            if score > self.high_score:
+                self.high_score = score
+                self.dirty = True
+
+    def record_run(self, score, best_combo, level):
+        """Add a finished run to the scoreboard if it makes the top N, and save promptly"""
+        entry = {'score': score, 'best_combo': best_combo, 'level': level, 'timestamp': time.time()}
+        with self.lock:
+            self.high_score = max(self.high_score, score)
+            self.scoreboard.append(entry)
+            self.scoreboard.sort(key=lambda entry: entry['score'], reverse=True)
+            del self.scoreboard[self.top_n:]
+            self.dirty = True
+        self.flush()
+
+    def flush(self):
+        """Ask the writer to save now instead of waiting out the debounce interval"""
+        self.flush_now.set()
+
+    def close(self):
+        """Save anything pending and stop the writer"""
+        self.closing = True
+        self.flush_now.set()
+        self.writer.join()
+
+    def _writer_loop(self):
+        while True:
+            self.flush_now.wait(self.flush_interval)
+            self.flush_now.clear()
+            self._write_pending()
+            if self.closing:
+                return
+
+    def _write_pending(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            high_score = self.high_score
+            scoreboard = list(self.scoreboard)
+            self.dirty = False
+        try:
+            write_atomic(self.high_score_path, str(high_score))
+            write_atomic(self.scoreboard_path, json.dumps(scoreboard))
+            self.writes += 1
+        except OSError:
+            # Fail silently if can't write file, but try again on the next flush
+            with self.lock:
+                self.dirty = True
@@ -0,0 +1,153 @@
+# Fixed-layout game state snapshots for instant retry, rewind and bot tree search
+
+import math
+import struct
+
+VERSION = 3  # 2: adds the run frame counters that event log records are stamped with; 3: Zach's launch_vel_y
+# Game fields, in layout order
+GAME_FIELDS = ('level', 'score', 'best_combo', 'combo_timer', 'total_spiders_defeated', 'spiders_defeated',
+               'level_transition_frames', 'frame', 'level_start_frame', 'level_transition', 'level_sound_played',
+               'game_over', 'game_won', 'zach_alive')
+GAME_FORMAT = 'iqiiiiiqq?????'
+# Zach's fields, after the game's
+ZACH_FIELDS = ('blocks', 'vel_y', 'on_ground', 'consecutive_kills', 'invincible_timer', 'just_lost_life',
+               'ground_lock_timer', 'launch_vel_y')
+ZACH_FORMAT = 'iiid?ii?id'  # rect.x, rect.y, then ZACH_FIELDS
+RNG_WORDS = 625  # random.Random state: 624 Mersenne Twister words plus the position
+
+
+class SnapshotFormat:
+    """Packs everything a Game's next step() depends on into `size` bytes and unpacks it in place.
+
+    The layout is fixed for a given spiders-per-level: a version number,
+    game counters and flags, Zach, then the x, y, speed, direction and alive flag of every
+    spider in spawn order, then the RNG state. Restoring moves the level's
+    existing Zach and spider sprites (or swarm arrays) into place instead of
+    rebuilding them. Popups are left as they are, and a recorded input log
+    does not describe a game that has been rewound.
+    """
+    def __init__(self, spiders):
+        self.spiders = spiders
+        self.struct = struct.Struct(f'<H{GAME_FORMAT}{ZACH_FORMAT}{spiders}d{spiders}d{spiders}d{spiders}b{spiders}?'
+                                    f'{RNG_WORDS}Id?')
+        self.size = self.struct.size
+        self.zach_start = len(GAME_FIELDS)
+        self.spiders_start = self.zach_start + 2 + len(ZACH_FIELDS)
+        self.rng_start = self.spiders_start + 5 * spiders
+
+    def save(self, game, buffer=None, offset=0):
+        """Pack game's state into buffer at offset (a new bytearray by default) and return the buffer"""
+        if buffer is None:
+            buffer = bytearray(self.size)
+        zach = game.zach
+        if game.swarm:
+            swarm = game.spiders
+            n = self.spiders
+            spiders = (swarm.x[:n].tolist() + swarm.y[:n].tolist() + swarm.speed[:n].tolist()
+                       + swarm.direction[:n].astype(int).tolist() + swarm.alive[:n].tolist())
+        else:
+            sprites = game.spider_sprites
+            spiders = ([sprite.rect.x for sprite in sprites] + [sprite.rect.y for sprite in sprites]
+                       + [sprite.speed for sprite in sprites] + [sprite.direction for sprite in sprites]
+                       + [sprite.alive() for sprite in sprites])
+        _, words, gauss_next = game.rng.getstate()
+        self.struct.pack_into(
+            buffer, offset, VERSION,
+            *[getattr(game, field) for field in GAME_FIELDS],
+            zach.rect.x, zach.rect.y, *[getattr(zach, field) for field in ZACH_FIELDS],
+            *spiders,
+            *words, math.nan if gauss_next is None else gauss_next, gauss_next is not None)
+        return buffer
+
+    def restore(self, game, buffer, offset=0):
+        """Put game back into the state packed in buffer at offset"""
+        version, *values = self.struct.unpack_from(buffer, offset)
+        if version != VERSION:
+            raise ValueError(f"Snapshot is version {version}, expected {VERSION}")
+        for field, value in zip(GAME_FIELDS, values):
+            setattr(game, field, value)
+
+        zach = game.zach
+        zach_values = values[self.zach_start:self.spiders_start]
+        if zach_values[2] != zach.blocks:
+            zach.blocks = zach_values[2]
+            zach.update_sprite()
+        zach.rect.x, zach.rect.y = zach_values[0], zach_values[1]
+        for field, value in zip(ZACH_FIELDS, zach_values[2:]):
+            setattr(zach, field, value)
+
+        n = self.spiders
+        start = self.spiders_start
+        xs, ys, speeds, directions, alive = (values[start + i * n:start + (i + 1) * n] for i in range(5))
+        if game.swarm:
+            swarm = game.spiders
+            swarm.count = n
+            swarm.x[:n] = xs
+            swarm.y[:n] = ys
+            swarm.speed[:n] = speeds
+            swarm.direction[:n] = directions
+            swarm.alive[:n] = alive
+            swarm.previous_x = None
+            swarm.grid_stale = True  # Re-indexed in bulk on the next collision query
+            game.all_sprites.empty()
+            if game.zach_alive:
+                game.all_sprites.add(zach)
+        else:
+            # Rebuild group membership in spawn order so iteration order matches an unrestored game
+            game.all_sprites.empty()
+            game.spiders.empty()
+            game.spider_grid.clear()
+            if game.zach_alive:
+                game.all_sprites.add(zach)
+            for sprite, x, y, speed, direction, is_alive in zip(game.spider_sprites, xs, ys, speeds, directions, alive):
+                sprite.rect.x = x
+                sprite.rect.y = y
+                sprite.speed = speed
+                sprite.direction = direction
+                if is_alive:
+                    game.spiders.add(sprite)
+                    game.all_sprites.add(sprite)
+                    game.spider_grid.insert(sprite, x, y)
+
+        rng_start = self.rng_start
+        gauss_next, has_gauss = values[rng_start + RNG_WORDS:]
+        game.rng.setstate((3, tuple(values[rng_start:rng_start + RNG_WORDS]), gauss_next if has_gauss else None))
+        game.previous_positions = None
+
+
+class SnapshotRing:
+    """The last `capacity` snapshots of a game in one preallocated buffer, for rewinding"""
+    def __init__(self, snapshot_format, capacity):
+        self.format = snapshot_format
+        self.capacity = capacity
+        self.buffer = bytearray(snapshot_format.size * capacity)
+        self.count = 0  # Snapshots held, up to capacity
+        self.next = 0   # Slot the next push writes
+
+    def clear(self):
+        self.count = 0
+        self.next = 0
+
+    def push(self, game):
+        """Save game into the next slot, overwriting the oldest snapshot when full"""
+        self.format.save(game, self.buffer, self.next * self.format.size)
+        self.next = (self.next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def rewind(self, game, frames):
+        """Restore the snapshot pushed `frames` pushes ago (or the oldest held) and drop the newer ones.
+
+        Returns how many pushes were actually rewound, 0 if the ring is empty.
+        """
+        if not self.count:
+            return 0
+        frames = max(1, min(frames, self.count))
+        slot = (self.next - frames) % self.capacity
+        self.format.restore(game, self.buffer, slot * self.format.size)
+        # The restored snapshot stays in the ring so repeated rewinds keep working
+        self.next = (slot + 1) % self.capacity
+        self.count -= frames - 1
+        return frames
+
+    def __len__(self):
+        return self.count
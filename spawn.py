@@ -0,0 +1,26 @@
+# Spawn placement: evenly random 1-D positions with a guaranteed minimum spacing, in O(n log n)
+
+import random
+
+
+def place_spaced(count, low, high, spacing, rng=random):
+    """Return (positions, spacing used) for `count` random integers in [low, high], `spacing` apart.
+
+    Picks count sorted offsets into the room left over once the gaps are
+    reserved: a random count-subset of range(slack + count) with each pick's
+    rank subtracted, which makes every valid layout equally likely. The i-th
+    gap is then added back to the i-th offset. No rejection sampling, so the
+    cost does not depend on how crowded the range is. When count positions
+    can't fit that far apart, the spacing shrinks to the widest that fits and
+    the caller can tell from the returned spacing. Positions come back in
+    random order.
+    """
+    if count <= 0:
+        return [], spacing
+    if count > 1 and (count - 1) * spacing > high - low:
+        spacing = (high - low) // (count - 1)
+    slack = high - low - (count - 1) * spacing
+    picks = sorted(rng.sample(range(slack + count), count))
+    positions = [low + pick - i + i * spacing for i, pick in enumerate(picks)]
+    rng.shuffle(positions)
+    return positions, spacing
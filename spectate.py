@@ -0,0 +1,367 @@
+# Spectator stream: broadcasts delta-compressed game state to socket clients from an asyncio thread
+#
+#   python main.py --spectate 127.0.0.1:8765
+#   python spectate.py --connect 127.0.0.1:8765
+#
+# Addresses are host:port for TCP or a filesystem path for a Unix socket.
+
+import argparse
+import asyncio
+import os
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+
+HELLO = b'ZSPC\x02'  # Sent once on connect: magic and protocol version
+KEYFRAME = 0
+DELTA = 1
+# kind, frame, level, score, consecutive kills, Zach's x, y, width, height, flags, spider count, entries
+HEADER = struct.Struct('<BIHqIiiiiBII')
+# Entries: every spider in a keyframe, only the ones that moved, died or came back in a delta
+SPIDER_DTYPE = np.dtype([('index', '<u4'), ('x', '<i2'), ('y', '<i2'), ('alive', 'u1')])
+SEND_BUFFER_BYTES = 1 << 15  # Kernel send buffer per client
+ZACH_ALIVE = 1
+LEVEL_TRANSITION = 2
+GAME_OVER = 4
+GAME_WON = 8
+
+
+def parse_address(address):
+    """Split 'host:port' into (host, port); anything else is a Unix socket path, returned as (path, None)"""
+    host, _, port = address.rpartition(':')
+    if host and port.isdigit():
+        return host, int(port)
+    return address, None
+
+
+class SpectatorState:
+    """What spectators see of a game: the HUD numbers, Zach's rect and every spider's position and alive flag"""
+    def __init__(self, capacity=0):
+        self.frame = 0
+        self.level = 0
+        self.score = 0
+        self.combo = 0
+        self.zach = (0, 0, 0, 0)
+        self.flags = 0
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.int16)
+        self.y = np.zeros(capacity, dtype=np.int16)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    def reserve(self, count):
+        if len(self.x) < count:
+            self.x = np.zeros(count, dtype=np.int16)
+            self.y = np.zeros(count, dtype=np.int16)
+            self.alive = np.zeros(count, dtype=bool)
+
+    def capture(self, game, frame):
+        """Read the state out of a live Game"""
+        self.frame = frame
+        self.level = game.level
+        self.score = game.score
+        zach = game.zach
+        self.combo = zach.consecutive_kills
+        self.zach = tuple(zach.rect)
+        self.flags = ((ZACH_ALIVE if game.zach_alive else 0) | (LEVEL_TRANSITION if game.level_transition else 0)
+                      | (GAME_OVER if game.game_over else 0) | (GAME_WON if game.game_won else 0))
+        if game.swarm:
+            swarm = game.spiders
+            n = swarm.count
+            self.reserve(n)
+            self.x[:n] = swarm.x[:n]
+            self.y[:n] = swarm.y[:n]
+            self.alive[:n] = swarm.alive[:n]
+        else:
+            sprites = game.spider_sprites
+            n = len(sprites)
+            self.reserve(n)
+            self.x[:n] = [sprite.rect.x for sprite in sprites]
+            self.y[:n] = [sprite.rect.y for sprite in sprites]
+            self.alive[:n] = [sprite.alive() for sprite in sprites]
+        self.count = n
+
+    def copy_from(self, other):
+        self.frame = other.frame
+        self.level = other.level
+        self.score = other.score
+        self.combo = other.combo
+        self.zach = other.zach
+        self.flags = other.flags
+        n = self.count = other.count
+        self.reserve(n)
+        self.x[:n] = other.x[:n]
+        self.y[:n] = other.y[:n]
+        self.alive[:n] = other.alive[:n]
+
+    def encode(self, baseline, keyframe):
+        """Encode this state as a keyframe, or as a delta from baseline, the state the receiver already has"""
+        n = self.count
+        if keyframe:
+            changed = np.arange(n)
+        else:
+            changed = np.flatnonzero((self.x[:n] != baseline.x[:n]) | (self.y[:n] != baseline.y[:n])
+                                     | (self.alive[:n] != baseline.alive[:n]))
+        entries = np.empty(len(changed), dtype=SPIDER_DTYPE)
+        entries['index'] = changed
+        entries['x'] = self.x[changed]
+        entries['y'] = self.y[changed]
+        entries['alive'] = self.alive[changed]
+        header = HEADER.pack(KEYFRAME if keyframe else DELTA, self.frame, self.level, self.score, self.combo,
+                             *self.zach, self.flags, n, len(changed))
+        return header + entries.tobytes()
+
+    def apply(self, header, payload):
+        """Update this state from a decoded HEADER tuple and its spider entries"""
+        _, self.frame, self.level, self.score, self.combo, x, y, w, h, self.flags, count, _ = header
+        self.zach = (x, y, w, h)
+        self.reserve(count)
+        self.count = count
+        entries = np.frombuffer(payload, dtype=SPIDER_DTYPE)
+        index = entries['index']
+        self.x[index] = entries['x']
+        self.y[index] = entries['y']
+        self.alive[index] = entries['alive'].astype(bool)
+
+    def live_spiders(self):
+        return int(self.alive[:self.count].sum())
+
+
+class _Spectator:
+    """One connected client and the last state it was sent"""
+    def __init__(self, writer):
+        self.writer = writer
+        self.task = asyncio.current_task()
+        self.wake = asyncio.Event()
+        self.sent = SpectatorState()
+        self.keyframe = None  # Frame of the last keyframe sent, None before the first
+        self.update = 0  # Server update the last message carried
+
+
+class SpectatorServer:
+    """Streams a Game's state to any number of spectators without making the game thread wait on them.
+
+    The game thread calls publish() once a frame, which copies the state into
+    a back buffer and swaps it with the front one under a lock; nothing else
+    happens on that thread. An asyncio loop on its own thread picks up the
+    newest state `rate` times a second and sends each client a delta from the
+    state that client already has: only the spiders that changed, plus the
+    HUD numbers and Zach's rect. Every `keyframe_interval` frames (and on
+    connect, or when the spider count changes) a client gets a keyframe with
+    every spider instead.
+
+    A client that reads slowly is never queued a backlog: while its last
+    message is still being written the states it missed simply pile up into
+    the next delta, and are counted as coalesced.
+    """
+    def __init__(self, address, rate=60, keyframe_interval=120):
+        self.host, self.port = parse_address(address)
+        self.interval = 1 / rate
+        self.keyframe_interval = keyframe_interval
+        self.lock = threading.Lock()
+        self.front = SpectatorState()
+        self.back = SpectatorState()
+        self.latest = SpectatorState()  # The server thread's copy of the newest state
+        self.published = 0  # States published by the game thread
+        self.updates = 0    # States the server thread picked up to send
+        self.clients = set()
+        self.messages = 0
+        self.keyframes = 0
+        self.bytes_sent = 0
+        self.coalesced = 0  # Picked-up states a slow client never saw because a newer one replaced them
+        self.error = None
+        self.loop = None
+        self.stopping = None
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self._thread_main, name='spectators', daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        if self.error is not None:
+            raise self.error
+
+    def publish(self, game):
+        """Hand the game's current state to the server; called from the game thread"""
+        if self.error is not None:
+            return  # The server has stopped (and said why)
+        back = self.back
+        back.capture(game, self.published + 1)
+        with self.lock:
+            self.back, self.front = self.front, back
+            self.published += 1
+
+    def close(self):
+        if self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.stopping.set)
+        self.thread.join()
+
+    def summary(self):
+        return (f"{self.messages} spectator messages ({self.keyframes} keyframes, {self.bytes_sent} bytes), "
+                f"{self.coalesced} states coalesced")
+
+    def stats_lines(self):
+        return [f"spectators {len(self.clients)}, {self.bytes_sent // 1024} KB sent",
+                f"spectator states coalesced {self.coalesced}"]
+
+    def _thread_main(self):
+        try:
+            asyncio.run(self._serve())
+        except Exception as error:
+            if self.ready.is_set():
+                print(f"Spectator server stopped: {error!r}")
+            self.error = error
+        finally:
+            self.ready.set()  # Unblocks __init__ if the server never started
+
+    async def _serve(self):
+        self.loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        if self.port is None:
+            server = await asyncio.start_unix_server(self._handle_client, self.host)
+        else:
+            server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.ready.set()
+        async with server:
+            pump = asyncio.create_task(self._pump())
+            stopping = asyncio.create_task(self.stopping.wait())
+            await asyncio.wait([pump, stopping], return_when=asyncio.FIRST_COMPLETED)
+            if pump.done():
+                self.error = pump.exception()  # The pump only ever ends by failing
+            pump.cancel()
+            stopping.cancel()
+            self.stopping.set()
+            clients = list(self.clients)
+            for client in clients:
+                client.writer.transport.abort()  # Don't wait for slow clients to read what is left
+                client.wake.set()
+            await asyncio.gather(*(client.task for client in clients), return_exceptions=True)
+        if self.port is None:
+            os.unlink(self.host)  # Unix socket files outlive their server
+        if self.error is not None:
+            raise self.error
+
+    async def _pump(self):
+        """Pick up the newest published state `rate` times a second and wake every client for it"""
+        seen = 0
+        while True:
+            await asyncio.sleep(self.interval)
+            with self.lock:
+                if self.published == seen:
+                    continue
+                seen = self.published
+                self.latest.copy_from(self.front)
+            self.updates += 1
+            for client in self.clients:
+                client.wake.set()
+
+    async def _handle_client(self, reader, writer):
+        client = _Spectator(writer)
+        # Keep at most one message queued in user space and little in the kernel, so a slow
+        # client holds up its own next message (where updates coalesce) instead of a backlog
+        writer.transport.set_write_buffer_limits(high=0)
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER_BYTES)
+        self.clients.add(client)
+        try:
+            writer.write(HELLO)
+            while True:
+                await client.wake.wait()
+                client.wake.clear()
+                if self.stopping.is_set():
+                    break
+                writer.write(self._encode(client))
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        except Exception as error:
+            # Anything else (say, a state that doesn't fit the wire format) would fail for every
+            # client, so stop the whole server instead of dropping clients one by one
+            self.error = error
+            self.stopping.set()
+        finally:
+            self.clients.discard(client)
+            writer.close()
+
+    def _encode(self, client):
+        latest = self.latest
+        keyframe = (client.keyframe is None or latest.count != client.sent.count
+                    or latest.frame - client.keyframe >= self.keyframe_interval)
+        if client.keyframe is not None:
+            self.coalesced += self.updates - client.update - 1
+        client.update = self.updates
+        message = latest.encode(client.sent, keyframe)
+        client.sent.copy_from(latest)
+        if keyframe:
+            client.keyframe = latest.frame
+            self.keyframes += 1
+        self.messages += 1
+        self.bytes_sent += len(message)
+        return message
+
+
+class SpectatorClient:
+    """Reference client: connects to a SpectatorServer and rebuilds the game state from its messages"""
+    def __init__(self):
+        self.state = SpectatorState()
+        self.reader = None
+        self.writer = None
+        self.messages = 0
+        self.bytes_received = 0
+
+    async def connect(self, address):
+        host, port = parse_address(address)
+        if port is None:
+            self.reader, self.writer = await asyncio.open_unix_connection(host)
+        else:
+            self.reader, self.writer = await asyncio.open_connection(host, port)
+        hello = await self.reader.readexactly(len(HELLO))
+        if hello != HELLO:
+            raise ValueError(f"Not a spectator stream (or an unsupported version): {hello!r}")
+
+    async def receive(self):
+        """Read and apply the next message; return (kind, state)"""
+        header = HEADER.unpack(await self.reader.readexactly(HEADER.size))
+        payload = await self.reader.readexactly(header[-1] * SPIDER_DTYPE.itemsize)
+        self.state.apply(header, payload)
+        self.messages += 1
+        self.bytes_received += HEADER.size + len(payload)
+        return header[0], self.state
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def watch(address, seconds):
+    """Print the reconstructed state about once a second"""
+    client = SpectatorClient()
+    await client.connect(address)
+    start = last_report = time.perf_counter()
+    try:
+        while seconds is None or time.perf_counter() - start < seconds:
+            _, state = await client.receive()
+            now = time.perf_counter()
+            if now - last_report >= 1.0:
+                last_report = now
+                print(f"frame {state.frame} level {state.level} score {state.score} combo {state.combo} "
+                      f"zach {state.zach} spiders {state.live_spiders()}/{state.count} "
+                      f"({client.messages} messages, {client.bytes_received} bytes)")
+    except asyncio.IncompleteReadError:
+        print("Stream closed")
+    finally:
+        client.close()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Watch a game streamed with --spectate")
+    parser.add_argument('--connect', metavar='ADDRESS', default='127.0.0.1:8765',
+                        help='host:port or Unix socket path of the game')
+    parser.add_argument('--seconds', type=float, default=None, help='stop after this long (default: until the game quits)')
+    args = parser.parse_args()
+    asyncio.run(watch(args.connect, args.seconds))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,97 @@
+# Fast-forward steps (Game.step with frames > 1) against the same frames stepped one at a time
+
+import os
+import random
+import sys
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import main
+from controls import NO_INPUT, FrameInput
+from main import Game
+
+STEP_FRAMES = (2, 4, 8)
+
+
+def drop_scenario(height, combo):
+    """A headless game with Zach falling from `height` px above a standing spider, `combo` kills into a chain"""
+    game = Game(headless=True, seed=1)
+    for i, spider in enumerate(game.spider_sprites):
+        # Only the first spider is under Zach; the rest stand still at the far right
+        x = 300 if i == 0 else main.SCREEN_WIDTH - main.SPIDER_WIDTH - 5 * i
+        spider.speed = 0
+        spider.rect.topleft = (x, main.SPIDER_SPAWN_Y)
+        game.spider_grid.move(spider, x, main.SPIDER_SPAWN_Y)
+    zach = game.zach
+    zach.invincible_timer = 0
+    zach.rect.x = 300
+    zach.rect.bottom = main.SPIDER_SPAWN_Y - height
+    zach.vel_y = 0
+    zach.on_ground = False
+    zach.consecutive_kills = combo
+    return game
+
+
+def step_until_kill(game, frames):
+    for _ in range(64 // frames):
+        game.step(NO_INPUT, frames)
+        if game.spiders_defeated:
+            return game
+    raise AssertionError("Zach never stomped the spider")
+
+
+def run_frames(game, frames, total=48):
+    for _ in range(total // frames):
+        game.step(NO_INPUT, frames)
+    return game
+
+
+def outcome(game):
+    zach = game.zach
+    return game.spiders_defeated, game.score, zach.consecutive_kills, zach.blocks, zach.on_ground
+
+
+@pytest.mark.parametrize('frames', STEP_FRAMES)
+@pytest.mark.parametrize('height', [0, 3, 10, 40])
+@pytest.mark.parametrize('combo', [0, 2])
+def test_stomp_matches_single_frame_steps(frames, height, combo):
+    expected = run_frames(drop_scenario(height, combo), 1)
+    game = run_frames(drop_scenario(height, combo), frames)
+    assert expected.spiders_defeated == 1
+    assert outcome(game) == outcome(expected)
+    # Rect positions round every step, so fewer steps can land a pixel or two off
+    assert abs(game.zach.rect.y - expected.zach.rect.y) <= 2
+    assert game.zach.vel_y == pytest.approx(expected.zach.vel_y)
+
+
+@pytest.mark.parametrize('frames', STEP_FRAMES)
+def test_no_jump_off_a_stomp_that_outran_the_landing(frames):
+    game = step_until_kill(drop_scenario(0, 0), frames)
+    bounce = game.zach.vel_y
+    game.step(FrameInput(jump=True), frames)
+    # Still rising from the bounce, so the jump key does nothing
+    assert game.zach.vel_y == pytest.approx(bounce + main.GRAVITY * frames)
+
+
+@pytest.mark.parametrize('frames', STEP_FRAMES)
+def test_stomped_zach_is_airborne_with_random_input(frames):
+    stomps = 0
+    for seed in range(4, 12):
+        game = Game(headless=True, seed=seed)
+        rng = random.Random(seed)
+        for _ in range(6000 // frames):
+            kills = game.spiders_defeated
+            level = game.level
+            game.step(FrameInput(left=rng.random() < 0.3, right=rng.random() < 0.4, jump=rng.random() < 0.3), frames)
+            if game.game_over:
+                break
+            if game.level == level and game.spiders_defeated > kills:
+                stomps += 1
+                assert not game.zach.on_ground
+                assert game.zach.vel_y < 0
+    assert stomps
@@ -0,0 +1,48 @@
+# Cached text rendering so HUD and overlay strings are only rasterized when they change
+
+from collections import OrderedDict
+
+
+class TextCache:
+    """Bounded LRU cache of rendered text surfaces keyed on (font, text, color)"""
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)  # Evict least recently used
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+class GlyphAtlas:
+    """Pre-rendered glyphs for a small character set, composed into strings by blitting"""
+    def __init__(self, font, chars, color):
+        self.glyphs = {char: font.render(char, True, color) for char in chars}
+
+    def width(self, text):
+        return sum(self.glyphs[char].get_width() for char in text)
+
+    def draw(self, surface, text, topleft):
+        """Blit text glyph by glyph starting at topleft"""
+        x, y = topleft
+        placed = []
+        for char in text:
+            glyph = self.glyphs[char]
+            placed.append((glyph, (x, y)))
+            x += glyph.get_width()
+        surface.blits(placed, doreturn=False)
@@ -0,0 +1,330 @@
+# Vectorized batch environment: N independent headless games stored as NumPy arrays and stepped together
+
+import os
+
+# The dummy drivers have to be selected before pygame initializes in main
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from main import (BASE_POINTS, COMBO_TIMEOUT_FRAMES, CONSEC_BONUS_PER, FINAL_LEVEL, FPS, GRAVITY, JUMP_SPEED,
+                  LEVEL_TRANSITION_FRAMES, MULTIKILL_MULTS, SCREEN_HEIGHT, SCREEN_WIDTH, SPIDER_HEIGHT,
+                  SPIDER_SPAWN_Y, SPIDER_SPEED_PER_LEVEL, SPIDER_WIDTH, SPIDERS_PER_LEVEL, ZACH_BLOCK_HEIGHT,
+                  ZACH_MAX_BLOCKS, ZACH_WIDTH, roll_spawn_xs, roll_spider_motion)
+
+# Action columns
+LEFT, RIGHT, JUMP = 0, 1, 2
+
+# Zach's starting state and movement, as set up in Zach.__init__
+ZACH_SPEED = 5
+ZACH_START_X = 100
+ZACH_START_BLOCKS = 2
+GROUND = SCREEN_HEIGHT - 60
+INVINCIBLE_FRAMES = 3 * FPS
+GROUND_LOCK_FRAMES = 15
+
+# Points multiplier by spiders killed in one stomp, indexed by min(kills, 4)
+MULTIKILL_TABLE = np.array([0.0] + [MULTIKILL_MULTS.get(kills, MULTIKILL_MULTS[4]) for kills in range(1, 5)])
+
+
+def round_rect(values):
+    """Round like pygame does when a float is assigned to a Rect coordinate (half away from zero)"""
+    return np.trunc(values + np.copysign(0.5, values))
+
+
+class BatchGame:
+    """N independent games advanced together by one vectorized step() per frame.
+
+    Every game follows the rules of Zach.update, Spider.update and
+    Game.handle_collisions. Spider placement and speeds are rolled from one
+    random.Random per game, seeded like Game(seed=...), so game i fed the same
+    inputs plays frame for frame like Game(headless=True, seed=seeds[i]) up to
+    its first game over. Finished games are reset at the end of the step that
+    finished them when auto_reset is set (Game needs a separate restart step
+    for that), otherwise they stay frozen until reset() is called.
+
+    gravity, jump_speed and speed_per_level override the game's physics and
+    spider speed-up for balancing experiments.
+    """
+    def __init__(self, num_envs, seeds=None, spiders_per_level=SPIDERS_PER_LEVEL, auto_reset=True,
+                 gravity=GRAVITY, jump_speed=JUMP_SPEED, speed_per_level=SPIDER_SPEED_PER_LEVEL):
+        self.num_envs = num_envs
+        self.spiders_per_level = spiders_per_level
+        self.auto_reset = auto_reset
+        self.gravity = gravity
+        self.jump_speed = jump_speed
+        self.speed_per_level = speed_per_level
+        if seeds is None:
+            seeds = [random.randrange(1 << 63) for _ in range(num_envs)]
+        self.seeds = list(seeds)
+        self.rngs = [random.Random(seed) for seed in self.seeds]
+
+        n, s = num_envs, spiders_per_level
+        # Zach
+        self.x = np.zeros(n, dtype=np.int64)
+        self.y = np.zeros(n, dtype=np.int64)  # Top of Zach's rect
+        self.vel_y = np.zeros(n)
+        self.blocks = np.zeros(n, dtype=np.int64)
+        self.on_ground = np.zeros(n, dtype=bool)
+        self.consecutive_kills = np.zeros(n, dtype=np.int64)
+        self.invincible_timer = np.zeros(n, dtype=np.int64)
+        self.ground_lock_timer = np.zeros(n, dtype=np.int64)
+        self.just_lost_life = np.zeros(n, dtype=bool)
+        # Spiders, one row per game
+        self.spider_x = np.zeros((n, s))
+        self.spider_speed = np.zeros((n, s))
+        self.spider_direction = np.zeros((n, s))
+        self.spider_alive = np.zeros((n, s), dtype=bool)
+        # Level, score and combo state
+        self.level = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.best_combo = np.zeros(n, dtype=np.int64)
+        self.combo_timer = np.zeros(n, dtype=np.int64)
+        self.spiders_defeated = np.zeros(n, dtype=np.int64)
+        self.total_spiders_defeated = np.zeros(n, dtype=np.int64)
+        self.level_transition = np.zeros(n, dtype=bool)
+        self.level_transition_frames = np.zeros(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.game_won = np.zeros(n, dtype=bool)
+        self.won = np.zeros(n, dtype=bool)  # Which games the last step() finished with a win
+        self.lost_life = np.zeros(n, dtype=bool)  # Which games Zach lost a block (or died) in during the last step()
+        self.steps = 0
+
+        self.reset()
+
+    def reset(self, envs=None):
+        """Start new games in the given envs (all by default), like Game.reset_game"""
+        envs = np.arange(self.num_envs) if envs is None else np.asarray(envs)
+        self.level[envs] = 1
+        self.score[envs] = 0
+        self.best_combo[envs] = 0
+        self.combo_timer[envs] = 0
+        self.total_spiders_defeated[envs] = 0
+        self.level_transition[envs] = False
+        self.game_won[envs] = False
+        self.setup_level(envs)
+
+    def setup_level(self, envs):
+        """Place a fresh Zach and the current level's spiders in each of envs, like Game.setup_level"""
+        self.x[envs] = ZACH_START_X
+        self.blocks[envs] = ZACH_START_BLOCKS
+        self.y[envs] = GROUND - ZACH_START_BLOCKS * ZACH_BLOCK_HEIGHT
+        self.vel_y[envs] = 0
+        self.on_ground[envs] = False
+        self.consecutive_kills[envs] = 0
+        self.invincible_timer[envs] = INVINCIBLE_FRAMES
+        self.ground_lock_timer[envs] = 0
+        self.just_lost_life[envs] = False
+        self.spiders_defeated[envs] = 0
+        self.game_over[envs] = False
+
+        # Rolled one game at a time so each game draws from its rng in Game's order
+        count = self.spiders_per_level
+        for env in np.atleast_1d(envs).tolist():
+            rng = self.rngs[env]
+            level = int(self.level[env])
+            self.spider_x[env] = roll_spawn_xs(count, rng)[0]
+            for i in range(count):
+                self.spider_speed[env, i], self.spider_direction[env, i] = roll_spider_motion(level, rng, self.speed_per_level)
+        self.spider_alive[envs] = True
+
+    def step(self, actions):
+        """Advance every game one frame from an (N, 3) array of left/right/jump flags.
+
+        Returns (rewards, dones): the points each game scored this frame and
+        whether it ended this frame. `won` tells the wins among them apart.
+        """
+        actions = np.asarray(actions, dtype=bool)
+        score_before = self.score.copy()
+        self.lost_life[:] = False
+        playing = ~self.game_over
+
+        # Level transitions count down and set up the next level on their last frame
+        transition = playing & self.level_transition
+        self.level_transition_frames -= transition
+        starting = transition & (self.level_transition_frames <= 0)
+        if starting.any():
+            self.level_transition[starting] = False
+            self.setup_level(np.flatnonzero(starting))
+        active = playing & ~self.level_transition
+
+        self._update_spiders(active)
+        self._update_zach(active, actions)
+        if COMBO_TIMEOUT_FRAMES is not None:
+            ticking = active & (self.combo_timer > 0)
+            self.combo_timer -= ticking
+            self.consecutive_kills[ticking & (self.combo_timer <= 0)] = 0
+        self._handle_collisions(active & (self.ground_lock_timer == 0))
+
+        rewards = (self.score - score_before).astype(np.float32)
+        dones = playing & self.game_over
+        self.won = dones & self.game_won
+        self.steps += 1
+        if self.auto_reset and dones.any():
+            self.reset(np.flatnonzero(dones))
+        return rewards, dones
+
+    def _update_spiders(self, active):
+        # Spider.update for every spider of the active games
+        moved = round_rect(self.spider_x + self.spider_speed * self.spider_direction)
+        hit_left = moved <= 0
+        hit_right = (moved >= SCREEN_WIDTH - SPIDER_WIDTH) & ~hit_left
+        moved[hit_left] = 0
+        moved[hit_right] = SCREEN_WIDTH - SPIDER_WIDTH
+        rows = active[:, None]
+        np.copyto(self.spider_x, moved, where=rows)
+        np.negative(self.spider_direction, out=self.spider_direction, where=rows & (hit_left | hit_right))
+
+    def _update_zach(self, active, actions):
+        # Zach.update: the ground lock and the frame after losing a life skip the vertical physics
+        self.invincible_timer -= active & (self.invincible_timer > 0)
+        locked = active & (self.ground_lock_timer > 0)
+        self.ground_lock_timer -= locked
+        recovering = active & ~locked & self.just_lost_life
+        self.just_lost_life &= ~recovering
+        free = active & ~locked & ~recovering
+
+        step_x = (actions[:, RIGHT].astype(np.int64) - actions[:, LEFT]) * ZACH_SPEED
+        self.x += step_x * (locked | free)
+        self._set_ground_position(locked | recovering)
+
+        jumping = free & actions[:, JUMP] & self.on_ground
+        self.vel_y[jumping] = self.jump_speed
+        self.on_ground &= ~jumping
+        vel_y = self.vel_y + self.gravity
+        np.copyto(self.vel_y, vel_y, where=free)
+        np.copyto(self.y, round_rect(self.y + vel_y).astype(np.int64), where=free)
+
+        landed = free & (self.y + self.blocks * ZACH_BLOCK_HEIGHT >= GROUND)
+        self.consecutive_kills[landed & ~self.on_ground] = 0  # Reset combo when landing
+        self._set_ground_position(landed)
+        np.clip(self.x, 0, SCREEN_WIDTH - ZACH_WIDTH, out=self.x, where=free)
+
+    def _set_ground_position(self, envs):
+        self.y[envs] = GROUND - self.blocks[envs] * ZACH_BLOCK_HEIGHT
+        self.vel_y[envs] = 0
+        self.on_ground |= envs
+
+    def _handle_collisions(self, checking):
+        # Overlap of Zach's rect with every spider's, as in Rect.colliderect
+        x = self.x[:, None]
+        y = self.y[:, None]
+        bottom = y + self.blocks[:, None] * ZACH_BLOCK_HEIGHT
+        touching = (self.spider_alive & checking[:, None]
+                    & (x < self.spider_x + SPIDER_WIDTH) & (self.spider_x < x + ZACH_WIDTH)
+                    & (y < SPIDER_SPAWN_Y + SPIDER_HEIGHT) & (SPIDER_SPAWN_Y < bottom))
+        if not touching.any():
+            return
+
+        # Stomps come from above while falling; any other touch hurts Zach
+        spider_center_y = SPIDER_SPAWN_Y + SPIDER_HEIGHT // 2
+        stomping = (bottom < spider_center_y + 10) & (self.vel_y > 0)[:, None]
+        hurt = (touching & ~stomping).any(axis=1)
+
+        damaged = hurt & (self.invincible_timer == 0)
+        dead = damaged & (self.blocks <= 1)
+        survived = damaged & ~dead
+        self.lost_life |= damaged
+        self.game_over |= dead
+        self.blocks -= survived
+        self._set_ground_position(survived)
+        self.just_lost_life |= survived
+        self.ground_lock_timer[survived] = GROUND_LOCK_FRAMES
+        self.invincible_timer[survived] = INVINCIBLE_FRAMES
+
+        kills = touching & ~hurt[:, None]
+        killed = kills.sum(axis=1)
+        scoring = killed > 0
+        if not scoring.any():
+            return
+        self.spider_alive &= ~kills
+        self.spiders_defeated += killed
+        self.total_spiders_defeated += killed
+
+        # Combo multiplier uses the consecutive kills from before this stomp
+        consec_mult = 1.0 + CONSEC_BONUS_PER * np.maximum(0, self.consecutive_kills)
+        self.consecutive_kills += killed
+        points = (BASE_POINTS * killed * consec_mult * MULTIKILL_TABLE[np.minimum(killed, 4)]).astype(np.int64)
+        self.score += points
+        np.maximum(self.best_combo, self.consecutive_kills, out=self.best_combo)
+        if COMBO_TIMEOUT_FRAMES is not None:
+            self.combo_timer[scoring] = COMBO_TIMEOUT_FRAMES
+        # Bounce height scales with number of spiders killed
+        np.copyto(self.vel_y, (self.jump_speed // 2) * killed, where=scoring)
+
+        cleared = scoring & (self.spiders_defeated >= self.spiders_per_level)
+        won = cleared & (self.level >= FINAL_LEVEL)
+        self.game_won |= won
+        self.game_over |= won
+        advancing = cleared & ~won
+        # Zach.add_life grows him upwards, keeping his feet where they were
+        growing = advancing & (self.blocks < ZACH_MAX_BLOCKS)
+        self.blocks += growing
+        self.y -= growing * ZACH_BLOCK_HEIGHT
+        self.level += advancing
+        self.level_transition |= advancing
+        self.level_transition_frames[advancing] = LEVEL_TRANSITION_FRAMES
+
+    def observe(self):
+        """Return an (N, 7 + 2 * spiders_per_level) float32 observation array.
+
+        Columns are Zach's x, y, vel_y, blocks, invincibility frames, on_ground
+        and level-transition flags, then each spider's x (-1 once killed) and
+        direction (0 once killed).
+        """
+        alive = self.spider_alive
+        return np.concatenate((
+            np.stack((self.x, self.y, self.vel_y, self.blocks, self.invincible_timer,
+                      self.on_ground, self.level_transition), axis=1),
+            np.where(alive, self.spider_x, -1),
+            np.where(alive, self.spider_direction, 0),
+        ), axis=1).astype(np.float32)
+
+
+def chase_actions(batch):
+    """headless.chase_bot for a whole batch: walk towards the nearest spider and jump when close to it"""
+    zach_center = batch.x + ZACH_WIDTH // 2
+    dx = batch.spider_x + SPIDER_WIDTH // 2 - zach_center[:, None]
+    distance = np.where(batch.spider_alive, np.abs(dx), np.inf)
+    nearest = distance.argmin(axis=1)
+    dx = dx[np.arange(batch.num_envs), nearest]
+    has_target = batch.spider_alive.any(axis=1)
+    actions = np.zeros((batch.num_envs, 3), dtype=bool)
+    actions[:, LEFT] = has_target & (dx < -5)
+    actions[:, RIGHT] = has_target & (dx > 5)
+    actions[:, JUMP] = has_target & (np.abs(dx) < 60)
+    return actions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Step a batch of Zach's Spider Adventure games with the chase bot")
+    parser.add_argument('--envs', type=int, default=4096, help='number of games stepped together')
+    parser.add_argument('--steps', type=int, default=2000, help='frames to step every game')
+    parser.add_argument('--seed', type=int, default=None, help='seed of the first game; the rest count up from it')
+    parser.add_argument('--spiders', type=int, default=SPIDERS_PER_LEVEL, help='spiders per level')
+    args = parser.parse_args()
+
+    seeds = None if args.seed is None else range(args.seed, args.seed + args.envs)
+    batch = BatchGame(args.envs, seeds=seeds, spiders_per_level=args.spiders)
+    episodes = wins = 0
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        _, dones = batch.step(chase_actions(batch))
+        if dones.any():
+            episodes += int(dones.sum())
+            wins += int(batch.won.sum())
+    elapsed = time.perf_counter() - start
+
+    env_steps = args.envs * args.steps
+    print(f"{env_steps:,} env-steps in {elapsed:.2f}s ({env_steps / elapsed:,.0f} env-steps/s)")
+    print(f"{episodes} finished games, {wins} won; mean level now {batch.level.mean():.2f}")
+
+
+if __name__ == "__main__":
+    main_cli()
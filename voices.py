@@ -0,0 +1,80 @@
+# Voice manager: sound effects play on a fixed set of mixer channels, split by category and stolen by priority
+
+import pygame
+
+
+class VoiceManager:
+    """Plays sounds on channels reserved per category instead of letting Sound.play() grab any free one.
+
+    `pools` maps a category name to its channel count, in channel order: with
+    {'announcer': 2, 'sfx': 6} channels 0-1 only ever play announcer clips and
+    2-7 only effects, so a burst of kill beeps can no longer crowd out a
+    multikill announcement. Every managed channel is reserved, so a stray
+    Sound.play() elsewhere never lands on one. Music is not mixed on channels
+    at all (see music.MusicPlayer), so it needs no pool.
+
+    When a category's channels are all busy, the new sound takes over the one
+    playing the lowest-priority sound (the oldest of those on a tie), as long
+    as that is not more important than itself; otherwise it is dropped. The
+    same sound played again within `repeat_frames` frames of the last time is
+    skipped, so a chain of kills in one step makes one beep, not a stack.
+    tick() advances the frame count and has to be called every step.
+    """
+    def __init__(self, pools, repeat_frames=3):
+        self.repeat_frames = repeat_frames
+        self.pools = {}
+        first = 0
+        for category, count in pools.items():
+            self.pools[category] = list(range(first, first + count))
+            first += count
+        if pygame.mixer.get_num_channels() < first:
+            pygame.mixer.set_num_channels(first)
+        pygame.mixer.set_reserved(first)
+        self.channels = [pygame.mixer.Channel(i) for i in range(first)]
+        self.priorities = [0] * first  # Priority of the sound each channel was last given
+        self.started = [0] * first     # Frame each channel's sound started on
+        self.last_played = {}  # sound -> frame it last started on, for the repeat limit
+        self.frame = 0
+        self.played = 0   # Sounds started
+        self.stolen = 0   # Sounds started by cutting off a less important one
+        self.dropped = 0  # Sounds skipped because every channel held something more important
+        self.limited = 0  # Sounds skipped as repeats within repeat_frames
+
+    def tick(self, frames=1):
+        self.frame += frames
+
+    def play(self, sound, category, priority=0):
+        """Play sound on one of category's channels; return whether it started"""
+        last = self.last_played.get(sound)
+        if last is not None and self.frame - last < self.repeat_frames:
+            self.limited += 1
+            return False
+        pool = self.pools[category]
+        victim = None
+        for index in pool:
+            if not self.channels[index].get_busy():
+                victim = index
+                break
+            if victim is None or (self.priorities[index], self.started[index]) < (self.priorities[victim], self.started[victim]):
+                victim = index
+        channel = self.channels[victim]
+        if channel.get_busy():
+            if self.priorities[victim] > priority:
+                self.dropped += 1
+                return False
+            self.stolen += 1
+        channel.play(sound)
+        self.priorities[victim] = priority
+        self.started[victim] = self.frame
+        self.last_played[sound] = self.frame
+        self.played += 1
+        return True
+
+    def stop(self):
+        for channel in self.channels:
+            channel.stop()
+
+    def stats_lines(self):
+        busy = sum(channel.get_busy() for channel in self.channels)
+        return [f"voices {busy}/{len(self.channels)} busy, {self.played} played",
+                f"voices {self.stolen} stolen {self.dropped} dropped {self.limited} limited"]